@@ -1,16 +1,22 @@
 import json
+import os
+from dataclasses import dataclass, asdict, fields
 from pathlib import Path
 from typing import Optional
-from pydantic import BaseModel
 
-class Config(BaseModel):
+_CONFIG_DIR = Path.home() / ".flow"
+_CONFIG_FILE = _CONFIG_DIR / "config.json"
+
+@dataclass(slots=True)
+class Config:
     dev_folder: str = "~/Development"
     ide: str = "cursor"
 
 class ConfigManager:
     def __init__(self):
-        self.config_dir = Path.home() / ".flow"
-        self.config_file = self.config_dir / "config.json"
+        self.config_dir = _CONFIG_DIR
+        self.config_file = _CONFIG_FILE
+        self._cache: Optional[Config] = None
         self._ensure_config_exists()
         
     def _ensure_config_exists(self):
@@ -20,16 +26,27 @@ class ConfigManager:
             self.save_config(Config())
     
     def load_config(self) -> Config:
-        """Load configuration from file."""
+        """Load configuration from file, reusing the cached copy if present."""
+        if self._cache is not None:
+            return self._cache
         try:
             config_data = json.loads(self.config_file.read_text())
-            return Config(**config_data)
+            known = {f.name for f in fields(Config)}
+            # Every setting is a string; values of any other type fall
+            # back to their defaults
+            self._cache = Config(**{
+                k: v for k, v in config_data.items() if k in known and isinstance(v, str)
+            })
         except Exception:
-            return Config()
+            self._cache = Config()
+        return self._cache
     
     def save_config(self, config: Config):
-        """Save configuration to file."""
-        self.config_file.write_text(config.model_dump_json(indent=2))
+        """Save configuration to file atomically."""
+        tmp_file = self.config_file.with_suffix(".json.tmp")
+        tmp_file.write_text(json.dumps(asdict(config), indent=2))
+        os.replace(tmp_file, self.config_file)
+        self._cache = config
     
     def update_config(self, **kwargs):
         """Update configuration with new values."""
@@ -1,25 +1,11 @@
 import typer
-from rich.console import Console
-from rich.panel import Panel
-import questionary
+import importlib
 import os
+from functools import lru_cache
 from pathlib import Path
 import signal
 import sys
 
-from .config import ConfigManager
-from .ui import UI
-from .templates import (
-    ReactTemplate,
-    ReactSupabaseTemplate,
-    PythonTemplate,
-    NextjsTemplate,
-    T3Template,
-    FastAPITemplate,
-    VueTemplate,
-    DjangoTemplate
-)
-
 app = typer.Typer(
     name="flow",
     help="A CLI tool for smooth development workflows",
@@ -29,9 +15,31 @@ app = typer.Typer(
 new_app = typer.Typer(help="Create new projects")
 app.add_typer(new_app, name="new")
 
-console = Console()
-config = ConfigManager()
-ui = UI()
+# Heavy dependencies (rich, questionary, the templates) are only
+# imported once a command needs them, so `flow --help` stays fast.
+def _get_config():
+    """Return the shared ConfigManager, creating it on first use."""
+    if "config" not in globals():
+        from .config import ConfigManager
+        globals()["config"] = ConfigManager()
+    return globals()["config"]
+
+def _get_ui():
+    """Return the shared UI instance, creating it on first use."""
+    if "ui" not in globals():
+        from .ui import UI
+        globals()["ui"] = UI()
+    return globals()["ui"]
+
+def __getattr__(name):
+    if name == "config":
+        return _get_config()
+    if name == "ui":
+        return _get_ui()
+    from . import templates
+    if name in templates.__all__:
+        return getattr(templates, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def setup_interrupt_handler():
     """Set up handler for SIGINT (Ctrl+C)."""
@@ -41,27 +49,39 @@ def setup_interrupt_handler():
     
     signal.signal(signal.SIGINT, signal_handler)
 
+@lru_cache(maxsize=None)
 def get_template_class(project_type: str, framework: str = None):
     """Get the appropriate template class based on project type and framework."""
-    if project_type == "React Frontend":
-        return NextjsTemplate if framework == "next" else ReactTemplate
-    elif project_type == "React + Supabase":
-        return ReactSupabaseTemplate
-    elif project_type == "T3 Stack":
-        return T3Template
-    elif project_type == "FastAPI Backend":
-        return FastAPITemplate
-    elif project_type == "Python Project":
-        return PythonTemplate
-    elif project_type == "Vue Frontend":
-        return VueTemplate
-    elif project_type == "Django Full-stack":
-        return DjangoTemplate
-    return None
+    # Only React distinguishes frameworks, and anything but Next.js means Vite
+    if project_type != "React Frontend" or framework != "next":
+        framework = None
+    
+    from .templates._registry import dispatch_table
+    
+    # Only the selected template's module is imported
+    target = dispatch_table().get((project_type, framework))
+    if target is None:
+        return None
+    
+    module_name, class_name = target
+    return getattr(importlib.import_module(f".templates.{module_name}", __package__), class_name)
+
+def _is_empty_dir(path: Path) -> bool:
+    """Check whether path is a directory without any entries."""
+    try:
+        with os.scandir(path) as entries:
+            return next(entries, None) is None
+    except OSError:
+        return False
 
 @new_app.command("project")
-def new_project():
+def new_project(
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="Show output of the commands run while generating"),
+    refresh_cache: bool = typer.Option(False, "--refresh-cache", help="Run project scaffolders again instead of reusing cached output"),
+):
     """Create a new project interactively."""
+    ui = _get_ui()
+    config = _get_config()
     try:
         setup_interrupt_handler()
         
@@ -101,9 +121,10 @@ def new_project():
         
         # Create project
         config_data = config.load_config()
-        target_dir = Path(os.path.expanduser(config_data.dev_folder)) / name
+        target_dir = Path(config_data.dev_folder).expanduser() / name
         
-        if target_dir.exists():
+        # An empty directory can simply be reused
+        if target_dir.exists() and not _is_empty_dir(target_dir):
             if not ui.confirm(f"Directory {target_dir} already exists. Overwrite?"):
                 ui.print_error("Project creation cancelled.")
                 raise typer.Exit(1)
@@ -113,8 +134,9 @@ def new_project():
             shutil.rmtree(target_dir)
         
         # Initialize and generate project
-        template = template_class(name, features, target_dir)
+        template = template_class(name, features, target_dir, verbose=verbose, refresh_cache=refresh_cache)
         if template.generate():
+            template.detach_interrupt_handler()
             ui.print_success(f"Project created successfully in {target_dir}")
             if config_data.ide == "cursor":
                 template.open_in_cursor()
@@ -125,6 +147,9 @@ def new_project():
     except KeyboardInterrupt:
         print("\n\nInterrupt received, exiting...")
         sys.exit(1)
+    except typer.Exit:
+        # Already reported where it was raised
+        raise
     except Exception as e:
         ui.print_error(f"An error occurred: {str(e)}")
         raise typer.Exit(1)
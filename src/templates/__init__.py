@@ -1,19 +1,19 @@
-from .react import ReactTemplate
-from .react_supabase import ReactSupabaseTemplate
-from .python import PythonTemplate
-from .nextjs import NextjsTemplate
-from .t3 import T3Template
-from .fastapi import FastAPITemplate
-from .vue import VueTemplate
-from .django import DjangoTemplate
+import importlib
 
-__all__ = [
-    'ReactTemplate',
-    'ReactSupabaseTemplate',
-    'PythonTemplate',
-    'NextjsTemplate',
-    'T3Template',
-    'FastAPITemplate',
-    'VueTemplate',
-    'DjangoTemplate'
-] 
\ No newline at end of file
+from ._registry import class_modules
+
+# Template classes are imported on first access (PEP 562) so that a CLI
+# invocation only pays the import cost of the template it actually uses.
+__all__ = list(class_modules())
+
+def __getattr__(name):
+    modules = class_modules()
+    if name not in modules:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(f".{modules[name]}", __name__)
+    cls = getattr(module, name)
+    globals()[name] = cls
+    return cls
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,28 @@
+from functools import cache
+
+# Every template the CLI can generate, as
+# (project type, module in this package, class name, framework).
+# Only React distinguishes frameworks; other entries use None.
+REGISTRY = (
+    ("React Frontend", "react", "ReactTemplate", None),
+    ("React Frontend", "nextjs", "NextjsTemplate", "next"),
+    ("React + Supabase", "react_supabase", "ReactSupabaseTemplate", None),
+    ("T3 Stack", "t3", "T3Template", None),
+    ("FastAPI Backend", "fastapi", "FastAPITemplate", None),
+    ("Python Project", "python", "PythonTemplate", None),
+    ("Vue Frontend", "vue", "VueTemplate", None),
+    ("Django Full-stack", "django", "DjangoTemplate", None),
+)
+
+@cache
+def dispatch_table():
+    """Map (project type, framework) to (module, class name)."""
+    return {
+        (project_type, framework): (module, class_name)
+        for project_type, module, class_name, framework in REGISTRY
+    }
+
+@cache
+def class_modules():
+    """Map each template class name to its module."""
+    return {class_name: module for _, module, class_name, _ in REGISTRY}
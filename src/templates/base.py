@@ -1,35 +1,205 @@
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+import hashlib
+import json
+import os
+import re
 import subprocess
 import shutil
 import signal
 import sys
+import tarfile
+import tempfile
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+from .. import config
+
+# Windows' CreateProcess searches PATH on every launch and ignores PATHEXT,
+# so tools such as npm (npm.cmd) are resolved once with shutil.which
+_RESOLVE_EXECUTABLES = os.name == "nt"
+
+@cache
+def _which(name: str) -> str:
+    return shutil.which(name) or name
+
+def _resolve_command(cmd: List[str]) -> List[str]:
+    if not _RESOLVE_EXECUTABLES:
+        return cmd
+    return [_which(cmd[0]), *cmd[1:]]
+
+# npm's audit and funding requests are pure overhead when scaffolding, and
+# npx/npm create would otherwise stop to ask before installing a
+# scaffolder when attached to a terminal. Set through the environment so
+# every npm and npx call, including those made by scaffolders, sees it.
+_NPM_CONFIG = {
+    "npm_config_audit": "false",
+    "npm_config_fund": "false",
+    "npm_config_update_notifier": "false",
+    "npm_config_yes": "true",
+}
+
+# Quiet commands spool stderr to a temporary file rather than memory, and
+# only this much of its end is shown when they fail
+_STDERR_TAIL = 64 * 1024
+
+def _stderr_tail(log) -> str:
+    log.seek(0, os.SEEK_END)
+    log.seek(max(0, log.tell() - _STDERR_TAIL))
+    return log.read().decode(errors="replace")
+
+def _cache_dir(name: str) -> Path:
+    """Return a cache directory kept alongside the flow configuration."""
+    return config._CONFIG_DIR / name
+
+# Scaffolder output from previous runs, keyed by template and options
+_SCAFFOLD_CACHE = "scaffolds"
+
+# Scaffolders run at @latest, so cached output older than this is
+# regenerated to pick up their updates
+_SCAFFOLD_TTL = 7 * 24 * 60 * 60
+
+# Scaffolder files besides package.json that name the project
+_NAMED_FILES = ("README.md", "index.html")
+
+# Installed packages and per-project secrets stay out of cached scaffolds;
+# .env.example is a template the project commits
+def _scaffold_filter(info: tarfile.TarInfo) -> Optional[tarfile.TarInfo]:
+    name = os.path.basename(info.name)
+    if name == "node_modules" or (name.startswith(".env") and name != ".env.example"):
+        return None
+    return info
+
+# node_modules installed by previous runs, keyed by the project's
+# package.json and the install commands run on it
+_MODULES_CACHE = "node_modules"
+
+# npm's own lockfile and manifest are restored along with node_modules
+_INSTALL_FILES = ("package.json", "package-lock.json")
+
+# Cached node_modules not restored for this long are deleted
+_MODULES_TTL = 30 * 24 * 60 * 60
+
+# Removing a large tree such as node_modules can take a long time, so
+# failed generations move it aside and delete it from a detached process
+# that outlives the CLI
+_RMTREE_SCRIPT = "import shutil, sys; shutil.rmtree(sys.argv[1], ignore_errors=True)"
+_DETACHED = (
+    {"creationflags": subprocess.DETACHED_PROCESS} if os.name == "nt"
+    else {"start_new_session": True}
+)
+
+def _rmtree_detached(path: Path):
+    """Delete a directory tree from a process that outlives the CLI."""
+    try:
+        subprocess.Popen(
+            [sys.executable, "-c", _RMTREE_SCRIPT, str(path)],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            **_DETACHED,
+        )
+    except OSError:
+        shutil.rmtree(path, ignore_errors=True)
+
+def _has_content(path: Path, content) -> bool:
+    """Return whether a file already holds exactly the given content."""
+    try:
+        if isinstance(content, bytes):
+            return path.read_bytes() == content
+        # write_text translates "\n" to os.linesep, so compare against
+        # the text as it would be written
+        with open(path, newline="") as f:
+            return f.read() == content.replace("\n", os.linesep)
+    except (OSError, ValueError):
+        return False
+
+# SIGINT handling is process-wide, so a single handler is installed and it
+# cleans up whichever template is currently being generated.
+_current = None
+
+def _handle_interrupt(sig, frame):
+    template = _current() if _current is not None else None
+    if template is not None and template._cleaning:
+        # Let the cleanup already in progress finish instead of leaving a
+        # half-removed tree behind
+        return
+    print("\n\nInterrupt received, cleaning up...")
+    if template is not None:
+        template._cleanup()
+    sys.exit(1)
 
 class BaseTemplate(ABC):
-    def __init__(self, project_name: str, features: List[str], target_dir: Path):
+    # Hardlink files when copying template directories. Linked files share
+    # their contents with the source, so templates whose sources may change
+    # underneath generated projects should turn this off.
+    _USE_HARDLINK = True
+    
+    # Worker threads used to flush queued file writes
+    _WRITE_WORKERS = 8
+    
+    def __init__(self, project_name: str, features: List[str], target_dir: Path, verbose: bool = False, refresh_cache: bool = False):
         self.project_name = project_name
         self.features = features
+        # Feature checks happen throughout generation; test against a set
+        self._features = frozenset(features)
         self.target_dir = target_dir
+        self.verbose = verbose
+        self.refresh_cache = refresh_cache
+        self._created_dirs = set()
+        self._pending_writes = {}
+        self._cleaning = False
         self._setup_interrupt_handler()
         
     def _setup_interrupt_handler(self):
         """Set up handler for SIGINT (Ctrl+C)."""
-        def signal_handler(sig, frame):
-            print("\n\nInterrupt received, cleaning up...")
-            self._cleanup()
-            sys.exit(1)
-        
-        signal.signal(signal.SIGINT, signal_handler)
+        global _current
+        _current = weakref.ref(self)
+        if signal.getsignal(signal.SIGINT) is not _handle_interrupt:
+            signal.signal(signal.SIGINT, _handle_interrupt)
+    
+    def detach_interrupt_handler(self):
+        """Stop cleaning up this template on SIGINT once the project is complete."""
+        global _current
+        if _current is not None and _current() is self:
+            _current = None
     
     def _cleanup(self):
         """Clean up any created directories or files."""
+        if self._cleaning:
+            return
+        self._cleaning = True
         try:
-            if self.target_dir.exists():
-                shutil.rmtree(self.target_dir)
-                print(f"\nCleaned up directory: {self.target_dir}")
+            self._created_dirs.clear()
+            self._pending_writes.clear()
+            # rmtree already walks the tree with os.scandir; let it report
+            # a missing directory instead of stat-ing it first
+            shutil.rmtree(self.target_dir)
+            print(f"\nCleaned up directory: {self.target_dir}")
+        except FileNotFoundError:
+            pass
         except Exception as e:
             print(f"\nError during cleanup: {e}")
+        finally:
+            self._cleaning = False
+    
+    def _cleanup_async(self):
+        """Clean up like _cleanup, deleting the directory in the background."""
+        if self._cleaning:
+            return
+        trash = self.target_dir.with_name(f".{self.target_dir.name}.{os.getpid()}.trash")
+        try:
+            os.rename(self.target_dir, trash)
+        except OSError:
+            # Missing, or cannot be moved aside
+            self._cleanup()
+            return
+        self._created_dirs.clear()
+        self._pending_writes.clear()
+        _rmtree_detached(trash)
+        print(f"\nCleaned up directory: {self.target_dir}")
     
     @abstractmethod
     def generate(self):
@@ -38,34 +208,296 @@ class BaseTemplate(ABC):
     
     def _create_directory(self, path: Path):
         """Create a directory if it doesn't exist."""
+        if path in self._created_dirs:
+            return
         path.mkdir(parents=True, exist_ok=True)
+        # mkdir(parents=True) created every ancestor as well
+        self._created_dirs.add(path)
+        self._created_dirs.update(path.parents)
+    
+    def _create_directories(self, *paths: Path):
+        """Create several directories, skipping those another path implies."""
+        ancestors = {parent for path in paths for parent in path.parents}
+        for path in paths:
+            if path not in ancestors:
+                self._create_directory(path)
     
     def _write_file(self, path: Path, content: str):
         """Write content to a file."""
-        path.write_text(content)
+        # Leave files that already match untouched, so regenerating keeps
+        # their mtimes and does not wake file watchers
+        if not _has_content(path, content):
+            path.write_text(content)
+    
+    def _write_bytes(self, path: Path, data: bytes):
+        """Write pre-encoded content to a file."""
+        if not _has_content(path, data):
+            path.write_bytes(data)
+    
+    def _queue_file(self, path: Path, content):
+        """Queue text or pre-encoded content for the next _flush_files call."""
+        # Keyed by path so a later write to the same file replaces an
+        # earlier one, as it would when writing immediately
+        self._pending_writes[path] = content
+    
+    def _flush_files(self):
+        """Write all queued files in parallel, raising the first error."""
+        writes, self._pending_writes = self._pending_writes, {}
+        if not writes:
+            return
+        if len(writes) == 1:
+            self._write_queued(*next(iter(writes.items())))
+            return
+        with ThreadPoolExecutor(max_workers=min(self._WRITE_WORKERS, len(writes))) as executor:
+            for _ in executor.map(lambda item: self._write_queued(*item), writes.items()):
+                pass
+    
+    def _write_queued(self, path: Path, content):
+        """Write a queued file with the writer matching its content type."""
+        if isinstance(content, bytes):
+            self._write_bytes(path, content)
+        else:
+            self._write_file(path, content)
     
     def _run_command(self, cmd: List[str], cwd: Path = None) -> bool:
-        """Run a shell command."""
+        """Run a shell command, hiding its output unless running verbosely."""
+        quiet = not self.verbose
+        log = tempfile.TemporaryFile() if quiet else None
         try:
-            result = subprocess.run(cmd, check=True, cwd=cwd or self.target_dir)
-            if result.returncode != 0:
-                self._cleanup()
-                return False
+            subprocess.run(
+                _resolve_command(cmd),
+                check=True,
+                cwd=cwd or self.target_dir,
+                env={**os.environ, **_NPM_CONFIG},
+                stdin=subprocess.DEVNULL if quiet else None,
+                stdout=subprocess.DEVNULL if quiet else None,
+                stderr=log,
+            )
             return True
         except subprocess.CalledProcessError:
-            self._cleanup()  # Clean up on command failure
+            if log is not None:
+                print(_stderr_tail(log), file=sys.stderr)
+            # A failed install can leave a large partial node_modules behind
+            self._cleanup_async()
             return False
         except KeyboardInterrupt:
             print("\n\nInterrupt received during command execution, cleaning up...")
             self._cleanup()
             sys.exit(1)
+        finally:
+            if log is not None:
+                log.close()
+    
+    def _npm_install_command(self, *packages: str, dev: bool = False) -> List[str]:
+        """Build the npm command installing the project's dependencies plus packages."""
+        # With a lockfile npm has nothing to resolve: a plain install can
+        # become `npm ci`, and added packages can prefer the local cache.
+        # Lifecycle scripts still run, as added packages may need their
+        # postinstall or native build steps.
+        # Audit and funding checks are disabled through _NPM_CONFIG.
+        lockfile = (self.target_dir / "package-lock.json").is_file()
+        if lockfile and not packages:
+            return ["npm", "ci"]
+        cmd = ["npm", "install"]
+        if dev and packages:
+            cmd.append("-D")
+        if lockfile:
+            cmd.append("--prefer-offline")
+        return [*cmd, *packages]
+    
+    def _start_command(self, cmd: List[str], cwd: Path = None) -> subprocess.Popen:
+        """Start a shell command without waiting for it to finish."""
+        quiet = not self.verbose
+        return subprocess.Popen(
+            _resolve_command(cmd),
+            cwd=cwd or self.target_dir,
+            env={**os.environ, **_NPM_CONFIG},
+            stdin=subprocess.DEVNULL if quiet else None,
+            stdout=subprocess.DEVNULL if quiet else None,
+            stderr=subprocess.PIPE if quiet else None,
+        )
+    
+    def _wait_command(self, proc: subprocess.Popen) -> bool:
+        """Wait for a command started with _start_command."""
+        try:
+            _, stderr = proc.communicate()
+            if proc.returncode != 0:
+                if stderr:
+                    print(stderr.decode(errors="replace"), file=sys.stderr)
+                self._cleanup_async()
+                return False
+            return True
+        except KeyboardInterrupt:
+            proc.kill()
+            print("\n\nInterrupt received during command execution, cleaning up...")
+            self._cleanup()
+            sys.exit(1)
+    
+    def _scaffold_archive(self, *options: str) -> Path:
+        """Return the cache archive for a scaffold generated with the given options."""
+        key = "|".join([type(self).__name__, *options])
+        digest = hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+        return _cache_dir(_SCAFFOLD_CACHE) / f"{digest}.tar"
+    
+    def _restore_scaffold(self, archive: Path) -> bool:
+        """Unpack a cached scaffold into the target directory."""
+        if self.refresh_cache:
+            return False
+        try:
+            if time.time() - archive.stat().st_mtime > _SCAFFOLD_TTL:
+                return False
+        except OSError:
+            return False
+        try:
+            shutil.unpack_archive(archive, self.target_dir, "tar")
+            cached_name = self._rename_package()
+            if cached_name and cached_name != self.project_name:
+                self._rename_files(cached_name)
+            return True
+        except Exception:
+            # Fall back to running the scaffolder on a clean directory
+            shutil.rmtree(self.target_dir, ignore_errors=True)
+            return False
+    
+    def _save_scaffold(self, archive: Path):
+        """Cache the freshly scaffolded target directory."""
+        if not self.target_dir.is_dir():
+            return
+        tmp_archive = archive.with_name(f"{archive.stem}.{os.getpid()}.tar")
+        try:
+            archive.parent.mkdir(parents=True, exist_ok=True)
+            with tarfile.open(tmp_archive, "w") as tar:
+                tar.add(self.target_dir, arcname=".", filter=_scaffold_filter)
+            os.replace(tmp_archive, archive)
+        except Exception:
+            # The cache is only an optimization
+            tmp_archive.unlink(missing_ok=True)
+    
+    def _rename_package(self) -> Optional[str]:
+        """Name a restored package.json after this project, returning its previous name."""
+        # Cached npm projects are named after the project they were
+        # first generated for
+        package_json = self.target_dir / "package.json"
+        if not package_json.is_file():
+            return None
+        package = json.loads(package_json.read_text())
+        cached_name = package.get("name")
+        package["name"] = self.project_name
+        package_json.write_text(json.dumps(package, indent=2) + "\n")
+        return cached_name
+    
+    def _rename_files(self, cached_name: str):
+        """Replace the cached project's name in the scaffolder's other files."""
+        pattern = re.compile(rf"(?<![\w-]){re.escape(cached_name)}(?![\w-])")
+        for name in _NAMED_FILES:
+            path = self.target_dir / name
+            if path.is_file():
+                content = path.read_text()
+                renamed = pattern.sub(lambda _: self.project_name, content)
+                if renamed != content:
+                    path.write_text(renamed)
+    
+    def _run_installs(self, *commands: List[str]) -> bool:
+        """Run npm install commands, reusing node_modules from an identical earlier run."""
+        if not commands:
+            return True
+        entry = self._modules_cache_entry(commands)
+        if entry is not None and self._restore_modules(entry):
+            # Native addons in the cache were built for whichever Node.js
+            # version installed them
+            return self._run_command(["npm", "rebuild"], self.target_dir)
+        for cmd in commands:
+            if not self._run_command(cmd, self.target_dir):
+                return False
+        if entry is not None:
+            self._save_modules(entry)
+        return True
+    
+    def _modules_cache_entry(self, commands) -> Optional[Path]:
+        """Return the node_modules cache entry for the project's manifest and commands."""
+        try:
+            manifests = [
+                (self.target_dir / name).read_text() if (self.target_dir / name).is_file() else None
+                for name in _INSTALL_FILES
+            ]
+            package = json.loads(manifests[0])
+        except (OSError, TypeError, ValueError):
+            return None
+        # The project name is the only part of a scaffold that varies
+        package.pop("name", None)
+        key = json.dumps([package, manifests[1], commands], sort_keys=True)
+        digest = hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+        return _cache_dir(_MODULES_CACHE) / digest
+    
+    def _restore_modules(self, entry: Path) -> bool:
+        """Copy a cached node_modules and its manifests into the project."""
+        if self.refresh_cache or not (entry / "node_modules").is_dir():
+            return False
+        node_modules = self.target_dir / "node_modules"
+        try:
+            shutil.rmtree(node_modules, ignore_errors=True)
+            # Real copies, as install scripts and users may modify files in
+            # node_modules in place
+            shutil.copytree(entry / "node_modules", node_modules, symlinks=True)
+            for name in _INSTALL_FILES:
+                if (entry / name).is_file():
+                    shutil.copy2(entry / name, self.target_dir / name)
+            self._rename_package()
+            # Keep recently used entries from being pruned
+            os.utime(entry)
+            return True
+        except Exception:
+            # Fall back to running the installs
+            shutil.rmtree(node_modules, ignore_errors=True)
+            return False
+    
+    def _save_modules(self, entry: Path):
+        """Cache the project's freshly installed node_modules."""
+        node_modules = self.target_dir / "node_modules"
+        if not node_modules.is_dir():
+            return
+        tmp_entry = entry.with_name(f"{entry.name}.{os.getpid()}")
+        try:
+            shutil.copytree(node_modules, tmp_entry / "node_modules", symlinks=True)
+            for name in _INSTALL_FILES:
+                if (self.target_dir / name).is_file():
+                    shutil.copy2(self.target_dir / name, tmp_entry / name)
+            os.replace(tmp_entry, entry)
+        except Exception:
+            # The cache is only an optimization
+            shutil.rmtree(tmp_entry, ignore_errors=True)
+        self._prune_modules()
+    
+    def _prune_modules(self):
+        """Delete cached node_modules that have not been used within _MODULES_TTL."""
+        cutoff = time.time() - _MODULES_TTL
+        try:
+            entries = list(os.scandir(_cache_dir(_MODULES_CACHE)))
+        except OSError:
+            return
+        for entry in entries:
+            try:
+                if entry.stat().st_mtime < cutoff:
+                    shutil.rmtree(entry.path, ignore_errors=True)
+            except OSError:
+                pass
     
     def _copy_template(self, src: Path, dest: Path):
         """Copy template files."""
         if src.is_file():
             shutil.copy2(src, dest)
-        else:
+        elif not self._USE_HARDLINK:
             shutil.copytree(src, dest, dirs_exist_ok=True)
+        else:
+            for root, _, files in os.walk(src):
+                dest_root = dest / Path(root).relative_to(src)
+                os.makedirs(dest_root, exist_ok=True)
+                for name in files:
+                    try:
+                        os.link(os.path.join(root, name), dest_root / name)
+                    except OSError:
+                        # Cross-device, existing target or no link support
+                        shutil.copy2(os.path.join(root, name), dest_root / name)
     
     def open_in_cursor(self):
         """Open the project in Cursor."""
@@ -1,19 +1,7 @@
-from pathlib import Path
-from typing import List
 from .base import BaseTemplate
 
-class PythonTemplate(BaseTemplate):
-    def generate(self):
-        """Generate a Python project structure."""
-        # Create project structure
-        src_dir = self.target_dir / "src"
-        tests_dir = self.target_dir / "tests"
-        
-        self._create_directory(src_dir)
-        self._create_directory(tests_dir)
-        
-        # Create main.py
-        main_content = """class MyProject:
+# File contents are encoded once at import and written with write_bytes
+_MAIN_PY = b"""class MyProject:
     def __init__(self):
         self.name = "MyProject"
     
@@ -27,21 +15,22 @@ def main():
 if __name__ == "__main__":
     main()
 """
-        self._write_file(src_dir / "main.py", main_content)
-        
-        # Create __init__.py files
-        self._write_file(src_dir / "__init__.py", "")
-        self._write_file(tests_dir / "__init__.py", "")
-        
-        # Create requirements.txt
-        requirements = """pytest>=7.0.0
+
+_REQUIREMENTS = b"""pytest>=7.0.0
 black>=23.0.0
 flake8>=6.0.0
 """
-        self._write_file(self.target_dir / "requirements.txt", requirements)
-        
-        # Create README.md
-        readme = f"""# {self.project_name}
+
+_TEST_MAIN = b"""import pytest
+from src.main import MyProject
+
+def test_hello():
+    project = MyProject()
+    assert project.hello() == "Hello from MyProject!"
+"""
+
+# The README is the only file that depends on the project
+_README = """# {project_name}
 
 A Python project created with Flow CLI.
 
@@ -72,16 +61,33 @@ Run tests with pytest:
 pytest tests/
 ```
 """
-        self._write_file(self.target_dir / "README.md", readme)
+
+class PythonTemplate(BaseTemplate):
+    def generate(self):
+        """Generate a Python project structure."""
+        # Create project structure
+        src_dir = self.target_dir / "src"
+        tests_dir = self.target_dir / "tests"
+        
+        self._create_directories(src_dir, tests_dir)
+        
+        # Create main.py
+        self._queue_file(src_dir / "main.py", _MAIN_PY)
+        
+        # Create __init__.py files
+        self._queue_file(src_dir / "__init__.py", b"")
+        self._queue_file(tests_dir / "__init__.py", b"")
+        
+        # Create requirements.txt
+        self._queue_file(self.target_dir / "requirements.txt", _REQUIREMENTS)
+        
+        # Create README.md
+        readme = _README.format_map({"project_name": self.project_name}).encode()
+        self._queue_file(self.target_dir / "README.md", readme)
         
         # Create test file
-        test_content = """import pytest
-from src.main import MyProject
-
-def test_hello():
-    project = MyProject()
-    assert project.hello() == "Hello from MyProject!"
-"""
-        self._write_file(tests_dir / "test_main.py", test_content)
+        self._queue_file(tests_dir / "test_main.py", _TEST_MAIN)
         
+        # Write all project files together
+        self._flush_files()
         return True
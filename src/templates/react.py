@@ -1,76 +1,12 @@
-from pathlib import Path
-from typing import List
 from .base import BaseTemplate
 
-class ReactTemplate(BaseTemplate):
-    def generate(self):
-        """Generate a React project using Vite."""
-        # Create project using Vite in the parent directory
-        parent_dir = self.target_dir.parent
-        template = "react-ts" if "TypeScript" in self.features else "react"
-        
-        # Ensure parent directory exists
-        parent_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Run create-vite in the parent directory
-        success = self._run_command([
-            "npm",
-            "create",
-            "vite@latest",
-            str(self.project_name),  # Use string path to avoid Path object issues
-            "--",
-            "--template",
-            template
-        ], cwd=parent_dir)
-        
-        if not success:
-            return False
-            
-        # Install dependencies
-        success = self._run_command(["npm", "install"], self.target_dir)
-        if not success:
-            return False
-            
-        # Add selected features
-        if "Tailwind CSS" in self.features:
-            success = self._setup_tailwind()
-            if not success:
-                return False
-            
-        if "ESLint" in self.features or "Prettier" in self.features:
-            self._setup_linting()
-        
-        return True
-    
-    def _setup_tailwind(self):
-        """Set up Tailwind CSS."""
-        try:
-            # Create src directory if it doesn't exist
-            src_dir = self.target_dir / "src"
-            src_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Add Tailwind CSS configuration
-            css_content = """@tailwind base;
+# File contents are module constants so they are built once at import
+_TAILWIND_CSS = """@tailwind base;
 @tailwind components;
 @tailwind utilities;
 """
-            self._write_file(self.target_dir / "src" / "index.css", css_content)
-            
-            # Install Tailwind and its dependencies
-            self._run_command([
-                "npm",
-                "install",
-                "-D",
-                "tailwindcss",
-                "postcss",
-                "autoprefixer"
-            ])
-            
-            # Initialize Tailwind
-            self._run_command(["npx", "tailwindcss", "init", "-p"])
-            
-            # Update tailwind.config.js
-            config_content = """/** @type {import('tailwindcss').Config} */
+
+_TAILWIND_CONFIG = """/** @type {import('tailwindcss').Config} */
 export default {
   content: [
     "./index.html",
@@ -82,26 +18,16 @@ export default {
   plugins: [],
 }
 """
-            self._write_file(self.target_dir / "tailwind.config.js", config_content)
-            return True
-        except (PermissionError, OSError):
-            return False
-    
-    def _setup_linting(self):
-        """Set up ESLint and Prettier."""
-        packages = []
-        
-        if "ESLint" in self.features:
-            packages.extend([
-                "eslint",
-                "@typescript-eslint/parser",
-                "@typescript-eslint/eslint-plugin",
-                "eslint-plugin-react",
-                "eslint-plugin-react-hooks"
-            ])
-            
-            # Create ESLint config
-            eslint_config = """{
+
+_POSTCSS_CONFIG = """export default {
+  plugins: {
+    tailwindcss: {},
+    autoprefixer: {},
+  },
+}
+"""
+
+_ESLINT_CONFIG = """{
   "env": {
     "browser": true,
     "es2021": true
@@ -128,37 +54,129 @@ export default {
   },
   "rules": {}
 }"""
-            self._write_file(self.target_dir / ".eslintrc.json", eslint_config)
-        
-        if "Prettier" in self.features:
-            packages.extend([
-                "prettier",
-                "eslint-config-prettier",
-                "eslint-plugin-prettier"
-            ])
-            
-            # Create Prettier config
-            prettier_config = """{
+
+_PRETTIER_CONFIG = """{
   "semi": true,
   "trailingComma": "es5",
   "singleQuote": true,
   "tabWidth": 2,
   "useTabs": false
 }"""
-            self._write_file(self.target_dir / ".prettierrc", prettier_config)
+
+class ReactTemplate(BaseTemplate):
+    def generate(self):
+        """Generate a React project using Vite."""
+        # Create project using Vite in the parent directory
+        parent_dir = self.target_dir.parent
+        template = "react-ts" if "TypeScript" in self._features else "react"
         
-        if packages:
-            self._run_command([
+        # Ensure parent directory exists
+        parent_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Reuse the output of an earlier create-vite run when available
+        archive = self._scaffold_archive(template)
+        if not self._restore_scaffold(archive):
+            # Run create-vite in the parent directory
+            success = self._run_command([
                 "npm",
-                "install",
-                "-D",
-                *packages
+                "create",
+                "vite@latest",
+                str(self.project_name),  # Use string path to avoid Path object issues
+                "--",
+                "--template",
+                template
+            ], cwd=parent_dir)
+            
+            if not success:
+                return False
+            self._save_scaffold(archive)
+            
+        # Set up feature files first so every dependency is installed
+        # in one npm run per dependency type
+        if "Tailwind CSS" in self._features:
+            if not self._setup_tailwind():
+                return False
+            
+        if "ESLint" in self._features or "Prettier" in self._features:
+            self._setup_linting()
+        
+        # Write the queued feature files together
+        try:
+            self._flush_files()
+        except OSError:
+            return False
+        
+        # Any npm install also installs the scaffold's own dependencies,
+        # so the plain install is only needed without other packages
+        packages, dev_packages = self._collect_packages()
+        if packages or not dev_packages:
+            if not self._run_command(self._npm_install_command(*packages), self.target_dir):
+                return False
+        
+        if dev_packages:
+            if not self._run_command(self._npm_install_command(*dev_packages, dev=True), self.target_dir):
+                return False
+        
+        return True
+    
+    def _collect_packages(self):
+        """Return the runtime and dev packages the selected features need."""
+        dev_packages = []
+        
+        if "Tailwind CSS" in self._features:
+            dev_packages.extend(["tailwindcss", "postcss", "autoprefixer"])
+        
+        if "ESLint" in self._features:
+            dev_packages.extend([
+                "eslint",
+                "@typescript-eslint/parser",
+                "@typescript-eslint/eslint-plugin",
+                "eslint-plugin-react",
+                "eslint-plugin-react-hooks"
+            ])
+        
+        if "Prettier" in self._features:
+            dev_packages.extend([
+                "prettier",
+                "eslint-config-prettier",
+                "eslint-plugin-prettier"
             ])
+        
+        return [], dev_packages
+    
+    def _setup_tailwind(self):
+        """Set up Tailwind CSS."""
+        try:
+            # Create src directory if it doesn't exist
+            src_dir = self.target_dir / "src"
+            src_dir.mkdir(parents=True, exist_ok=True)
+            
+            # Add Tailwind CSS configuration
+            self._queue_file(self.target_dir / "src" / "index.css", _TAILWIND_CSS)
             
-            # Add scripts to package.json
-            scripts = {
-                "lint": "eslint src --ext ts,tsx --report-unused-disable-directives --max-warnings 0",
-                "format": "prettier --write \"src/**/*.{ts,tsx}\""
-            }
+            # Write what `tailwindcss init -p` would create
+            self._queue_file(self.target_dir / "postcss.config.js", _POSTCSS_CONFIG)
             
-            # TODO: Update package.json with new scripts
+            # Update tailwind.config.js
+            self._queue_file(self.target_dir / "tailwind.config.js", _TAILWIND_CONFIG)
+            return True
+        except (PermissionError, OSError):
+            return False
+    
+    def _setup_linting(self):
+        """Set up ESLint and Prettier."""
+        if "ESLint" in self._features:
+            # Create ESLint config
+            self._queue_file(self.target_dir / ".eslintrc.json", _ESLINT_CONFIG)
+        
+        if "Prettier" in self._features:
+            # Create Prettier config
+            self._queue_file(self.target_dir / ".prettierrc", _PRETTIER_CONFIG)
+        
+        # Add scripts to package.json
+        scripts = {
+            "lint": "eslint src --ext ts,tsx --report-unused-disable-directives --max-warnings 0",
+            "format": "prettier --write \"src/**/*.{ts,tsx}\""
+        }
+        
+        # TODO: Update package.json with new scripts
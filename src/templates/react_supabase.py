@@ -1,67 +1,19 @@
-from pathlib import Path
-from typing import List
 from .react import ReactTemplate
 
-class ReactSupabaseTemplate(ReactTemplate):
-    def generate(self):
-        """Generate a React + Supabase project."""
-        # First generate the base React project
-        if not super().generate():
-            return False
-            
-        # Install Supabase client
-        if not self._run_command([
-            "npm",
-            "install",
-            "@supabase/supabase-js"
-        ]):
-            return False
-        
-        try:
-            # Create Supabase client configuration
-            self._setup_supabase_client()
-            
-            # Add selected Supabase features
-            if "Authentication" in self.features:
-                self._setup_auth()
-                
-            if "Database Helpers" in self.features:
-                self._setup_database_helpers()
-                
-            if "Storage Helpers" in self.features:
-                self._setup_storage_helpers()
-                
-            return True
-        except Exception:
-            self._cleanup()
-            return False
-    
-    def _setup_supabase_client(self):
-        """Set up Supabase client configuration."""
-        # Create src directory if it doesn't exist
-        src_dir = self.target_dir / "src"
-        src_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Create .env file
-        env_content = """VITE_SUPABASE_URL=your-project-url
+# File contents are module constants so they are built once at import
+_ENV = """VITE_SUPABASE_URL=your-project-url
 VITE_SUPABASE_ANON_KEY=your-anon-key
 """
-        self._write_file(self.target_dir / ".env", env_content)
-        
-        # Create Supabase client file
-        client_content = """import { createClient } from '@supabase/supabase-js'
+
+_SUPABASE_CLIENT = """import { createClient } from '@supabase/supabase-js'
 
 const supabaseUrl = import.meta.env.VITE_SUPABASE_URL
 const supabaseAnonKey = import.meta.env.VITE_SUPABASE_ANON_KEY
 
 export const supabase = createClient(supabaseUrl, supabaseAnonKey)
 """
-        self._write_file(self.target_dir / "src" / "supabase.ts", client_content)
-    
-    def _setup_auth(self):
-        """Set up authentication components."""
-        # Create Auth context
-        auth_context = """import { createContext, useContext, useState, useEffect } from 'react'
+
+_AUTH_CONTEXT = """import { createContext, useContext, useState, useEffect } from 'react'
 import { supabase } from './supabase'
 import type { User } from '@supabase/supabase-js'
 
@@ -108,11 +60,8 @@ export function AuthProvider({ children }: { children: React.ReactNode }) {
 
 export const useAuth = () => useContext(AuthContext)
 """
-        self._write_file(self.target_dir / "src" / "auth.tsx", auth_context)
-    
-    def _setup_database_helpers(self):
-        """Set up database helper functions."""
-        db_helpers = """import { supabase } from './supabase'
+
+_DB_HELPERS = """import { supabase } from './supabase'
 
 export async function fetchData<T>(
   table: string,
@@ -172,11 +121,8 @@ export async function deleteData(
   if (error) throw error
 }
 """
-        self._write_file(self.target_dir / "src" / "db.ts", db_helpers)
-    
-    def _setup_storage_helpers(self):
-        """Set up storage helper functions."""
-        storage_helpers = """import { supabase } from './supabase'
+
+_STORAGE_HELPERS = """import { supabase } from './supabase'
 
 export async function uploadFile(
   bucket: string,
@@ -225,4 +171,61 @@ export function getPublicUrl(
   return data.publicUrl
 }
 """
-        self._write_file(self.target_dir / "src" / "storage.ts", storage_helpers) 
\ No newline at end of file
+
+class ReactSupabaseTemplate(ReactTemplate):
+    def generate(self):
+        """Generate a React + Supabase project."""
+        # First generate the base React project, which also installs the
+        # Supabase client (see _collect_packages)
+        if not super().generate():
+            return False
+        
+        try:
+            # Create Supabase client configuration
+            self._setup_supabase_client()
+            
+            # Add selected Supabase features
+            if "Authentication" in self._features:
+                self._setup_auth()
+                
+            if "Database Helpers" in self._features:
+                self._setup_database_helpers()
+                
+            if "Storage Helpers" in self._features:
+                self._setup_storage_helpers()
+            
+            # The helper files are independent, so write them together
+            self._flush_files()
+            return True
+        except Exception:
+            self._cleanup()
+            return False
+    
+    def _collect_packages(self):
+        """Install the Supabase client with the base React dependencies."""
+        packages, dev_packages = super()._collect_packages()
+        return [*packages, "@supabase/supabase-js"], dev_packages
+    
+    def _setup_supabase_client(self):
+        """Set up Supabase client configuration."""
+        # Create src directory if it doesn't exist
+        self._create_directory(self.target_dir / "src")
+        
+        # Create .env file
+        self._queue_file(self.target_dir / ".env", _ENV)
+        
+        # Create Supabase client file
+        self._queue_file(self.target_dir / "src" / "supabase.ts", _SUPABASE_CLIENT)
+    
+    def _setup_auth(self):
+        """Set up authentication components."""
+        # Create Auth context
+        self._queue_file(self.target_dir / "src" / "auth.tsx", _AUTH_CONTEXT)
+    
+    def _setup_database_helpers(self):
+        """Set up database helper functions."""
+        self._queue_file(self.target_dir / "src" / "db.ts", _DB_HELPERS)
+    
+    def _setup_storage_helpers(self):
+        """Set up storage helper functions."""
+        self._queue_file(self.target_dir / "src" / "storage.ts", _STORAGE_HELPERS) 
\ No newline at end of file
@@ -1,108 +1,29 @@
-from pathlib import Path
-from typing import List
+import re
+import secrets
 from .base import BaseTemplate
 
-class T3Template(BaseTemplate):
-    def generate(self):
-        """Generate a T3 Stack project."""
-        try:
-            # Create project using create-t3-app
-            cmd = [
-                "npx",
-                "create-t3-app@latest",
-                str(self.project_name),
-                "--noGit",  # We'll handle git ourselves
-                "--CI",  # Run in CI mode for automated setup
-            ]
+# create-t3-app options enabled by each feature
+_CREATE_T3_FLAGS = (
+    ("NextAuth", "--nextAuth"),
+    ("Prisma", "--prisma"),
+)
 
-            # Add feature flags when running in CI mode
-            if "NextAuth" in self.features:
-                cmd.extend(["--nextAuth", "true"])
-            if "Prisma" in self.features:
-                cmd.extend(["--prisma", "true"])
-            
-            # Always include these core features
-            cmd.extend([
-                "--tailwind", "true",
-                "--trpc", "true",
-                "--appRouter", "true"
-            ])
-
-            success = self._run_command(cmd, cwd=self.target_dir.parent)
-            
-            if not success:
-                return False
+# create-t3-app options every project gets
+_CREATE_T3_CORE = ("--tailwind", "true", "--trpc", "true", "--appRouter", "true")
 
-            # Create project directory if it doesn't exist
-            self._create_directory(self.target_dir)
-            
-            # Install additional dependencies
-            packages = []
-            dev_packages = []
-            
-            if "PWA" in self.features:
-                packages.extend([
-                    "next-pwa"
-                ])
-                if not self._setup_pwa():
-                    return False
-            
-            if "Jest" in self.features:
-                dev_packages.extend([
-                    "@testing-library/react",
-                    "@testing-library/jest-dom",
-                    "jest",
-                    "@types/jest",
-                    "ts-jest"
-                ])
-                if not self._setup_testing():
-                    return False
-            
-            if "tRPC-Sub" in self.features:
-                packages.extend([
-                    "@trpc/server",
-                    "@trpc/client",
-                    "ws",
-                    "@trpc/react-query"
-                ])
-                if not self._setup_trpc_subscriptions():
-                    return False
-            
-            # Install packages
-            if packages:
-                success = self._run_command([
-                    "npm",
-                    "install",
-                    *packages
-                ], self.target_dir)
-                if not success:
-                    return False
-            
-            if dev_packages:
-                success = self._run_command([
-                    "npm",
-                    "install",
-                    "-D",
-                    *dev_packages
-                ], self.target_dir)
-                if not success:
-                    return False
-            
-            # Set up additional configurations
-            if not self._setup_config_files():
-                return False
-            
-            return True
-        except Exception as e:
-            print(f"Error during project generation: {e}")
-            self._cleanup()
-            return False
-    
-    def _setup_config_files(self) -> bool:
-        """Set up additional configuration files."""
-        try:
-            # Update tsconfig.json with better defaults
-            tsconfig = """{
+# create-t3-app fills this in .env with a random secret; projects restored
+# from a cached scaffold, which leaves .env out, get their own
+_AUTH_SECRET = re.compile(r'^AUTH_SECRET=""$', re.MULTILINE)
+
+# Directories the feature setup steps write into
+_FEATURE_DIRS = (
+    ("PWA", ("public",)),
+    ("Jest", ("src", "test")),
+    ("tRPC-Sub", ("src", "utils")),
+)
+
+# File contents are module constants so they are built once at import
+_TSCONFIG = """{
   "compilerOptions": {
     "target": "es2017",
     "lib": ["dom", "dom.iterable", "esnext"],
@@ -135,18 +56,8 @@ class T3Template(BaseTemplate):
   ],
   "exclude": ["node_modules"]
 }"""
-            self._write_file(self.target_dir / "tsconfig.json", tsconfig)
-            return True
-        except Exception:
-            return False
-    
-    def _setup_pwa(self) -> bool:
-        """Set up PWA configuration."""
-        try:
-            # Create necessary directories
-            self._create_directory(self.target_dir / "public")
-            
-            next_config = """import { withPWA } from 'next-pwa';
+
+_NEXT_CONFIG_PWA = """import { withPWA } from 'next-pwa';
 
 /** @type {import('next').NextConfig} */
 const nextConfig = {
@@ -158,9 +69,8 @@ export default withPWA({
   disable: process.env.NODE_ENV === 'development',
 })(nextConfig);
 """
-            self._write_file(self.target_dir / "next.config.mjs", next_config)
-            
-            manifest = """{
+
+_MANIFEST = """{
   "name": "T3 App",
   "short_name": "T3 App",
   "description": "Full-stack application built with the T3 Stack",
@@ -181,18 +91,8 @@ export default withPWA({
     }
   ]
 }"""
-            self._write_file(self.target_dir / "public" / "manifest.json", manifest)
-            return True
-        except Exception:
-            return False
-    
-    def _setup_testing(self) -> bool:
-        """Set up Jest testing configuration."""
-        try:
-            # Create necessary directories
-            self._create_directory(self.target_dir / "src" / "test")
-            
-            jest_config = """/** @type {import('ts-jest').JestConfigWithTsJest} */
+
+_JEST_CONFIG = """/** @type {import('ts-jest').JestConfigWithTsJest} */
 module.exports = {
   preset: 'ts-jest',
   testEnvironment: 'jsdom',
@@ -201,21 +101,10 @@ module.exports = {
   },
   setupFilesAfterEnv: ['<rootDir>/src/test/setup.ts'],
 };"""
-            self._write_file(self.target_dir / "jest.config.js", jest_config)
-            
-            test_setup = """import '@testing-library/jest-dom';"""
-            self._write_file(self.target_dir / "src" / "test" / "setup.ts", test_setup)
-            return True
-        except Exception:
-            return False
-    
-    def _setup_trpc_subscriptions(self) -> bool:
-        """Set up tRPC subscriptions."""
-        try:
-            # Create necessary directories
-            self._create_directory(self.target_dir / "src" / "utils")
-            
-            ws_context = """import { createWSClient, wsLink } from '@trpc/client';
+
+_JEST_SETUP = """import '@testing-library/jest-dom';"""
+
+_TRPC_WS_API = """import { createWSClient, wsLink } from '@trpc/client';
 import { createTRPCNext } from '@trpc/next';
 import { type AppRouter } from '~/server/api/root';
 
@@ -246,7 +135,136 @@ export const api = createTRPCNext<AppRouter>({
   },
   ssr: false,
 });"""
-            self._write_file(self.target_dir / "src" / "utils" / "api.ts", ws_context)
+
+class T3Template(BaseTemplate):
+    def generate(self):
+        """Generate a T3 Stack project."""
+        try:
+            # Create project using create-t3-app
+            cmd = [
+                "npx",
+                "create-t3-app@latest",
+                str(self.project_name),
+                "--noGit",  # We'll handle git ourselves
+                "--CI",  # Run in CI mode for automated setup
+                "--noInstall",  # Installed below, through the node_modules cache
+                *(arg for feature, flag in _CREATE_T3_FLAGS if feature in self._features for arg in (flag, "true")),
+                *_CREATE_T3_CORE,
+            ]
+
+            # Reuse the output of an earlier create-t3-app run with the
+            # same options when available
+            archive = self._scaffold_archive(*cmd[3:])
+            if self._restore_scaffold(archive):
+                self._write_env()
+            else:
+                success = self._run_command(cmd, cwd=self.target_dir.parent)
+                
+                if not success:
+                    return False
+                self._save_scaffold(archive)
+
+            # Create the project directory and every directory the selected
+            # features write into in one sweep
+            self._create_directories(self.target_dir, *(
+                self.target_dir.joinpath(*parts)
+                for feature, parts in _FEATURE_DIRS if feature in self._features
+            ))
+            
+            # Install additional dependencies
+            packages = []
+            dev_packages = []
+            
+            if "PWA" in self._features:
+                packages.extend([
+                    "next-pwa"
+                ])
+                if not self._setup_pwa():
+                    return False
+            
+            if "Jest" in self._features:
+                dev_packages.extend([
+                    "@testing-library/react",
+                    "@testing-library/jest-dom",
+                    "jest",
+                    "@types/jest",
+                    "ts-jest"
+                ])
+                if not self._setup_testing():
+                    return False
+            
+            if "tRPC-Sub" in self._features:
+                packages.extend([
+                    "@trpc/server",
+                    "@trpc/client",
+                    "ws",
+                    "@trpc/react-query"
+                ])
+                if not self._setup_trpc_subscriptions():
+                    return False
+            
+            # Install the scaffold's and the features' packages, reusing the
+            # node_modules of an earlier project with the same dependencies
+            # when available
+            commands = [self._npm_install_command(*packages)]
+            if dev_packages:
+                commands.append(self._npm_install_command(*dev_packages, dev=True))
+            if not self._run_installs(*commands):
+                return False
+            
+            # Set up additional configurations
+            if not self._setup_config_files():
+                return False
+            
+            # The feature setup steps only queue their files; they are
+            # independent, so write them together
+            self._flush_files()
+            return True
+        except Exception as e:
+            print(f"Error during project generation: {e}")
+            self._cleanup_async()
+            return False
+    
+    def _write_env(self):
+        """Create .env from .env.example with a fresh auth secret."""
+        example = self.target_dir / ".env.example"
+        if example.is_file():
+            env = _AUTH_SECRET.sub(lambda _: f'AUTH_SECRET="{secrets.token_urlsafe(32)}"', example.read_text())
+            self._write_file(self.target_dir / ".env", env)
+    
+    def _setup_config_files(self) -> bool:
+        """Set up additional configuration files."""
+        try:
+            # Update tsconfig.json with better defaults
+            self._queue_file(self.target_dir / "tsconfig.json", _TSCONFIG)
+            return True
+        except Exception:
+            return False
+    
+    def _setup_pwa(self) -> bool:
+        """Set up PWA configuration."""
+        try:
+            self._queue_file(self.target_dir / "next.config.mjs", _NEXT_CONFIG_PWA)
+            
+            self._queue_file(self.target_dir / "public" / "manifest.json", _MANIFEST)
+            return True
+        except Exception:
+            return False
+    
+    def _setup_testing(self) -> bool:
+        """Set up Jest testing configuration."""
+        try:
+            self._queue_file(self.target_dir / "jest.config.js", _JEST_CONFIG)
+            
+            self._queue_file(self.target_dir / "src" / "test" / "setup.ts", _JEST_SETUP)
+            return True
+        except Exception:
+            return False
+    
+    def _setup_trpc_subscriptions(self) -> bool:
+        """Set up tRPC subscriptions."""
+        try:
+            self._queue_file(self.target_dir / "src" / "utils" / "api.ts", _TRPC_WS_API)
             return True
         except Exception:
             return False 
\ No newline at end of file
@@ -1,83 +1,31 @@
-from pathlib import Path
-from typing import List
 from .base import BaseTemplate
 
-class VueTemplate(BaseTemplate):
-    def generate(self):
-        """Generate a Vue 3 project using Vite."""
-        # Create project using create-vue in the parent directory
-        parent_dir = self.target_dir.parent
-        
-        # Ensure parent directory exists
-        parent_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Build create-vue command with selected features
-        cmd = [
-            "npm",
-            "create",
-            "vue@latest",
-            str(self.project_name),
-            "--",
-            "--typescript" if "TypeScript" in self.features else "",
-            "--jsx" if "JSX" in self.features else "",
-            "--router" if "Vue Router" in self.features else "",
-            "--pinia" if "Pinia" in self.features else "",
-            "--vitest" if "Vitest" in self.features else "",
-            "--cypress" if "Cypress" in self.features else "",
-            "--eslint" if "ESLint" in self.features else "",
-            "--prettier" if "Prettier" in self.features else "",
-        ]
-        
-        # Filter out empty strings
-        cmd = [arg for arg in cmd if arg]
-        
-        success = self._run_command(cmd, cwd=parent_dir)
-        if not success:
-            return False
-        
-        # Install dependencies
-        self._run_command(["npm", "install"], self.target_dir)
-        
-        # Add additional features
-        if "Tailwind CSS" in self.features:
-            self._setup_tailwind()
-            
-        if "PWA" in self.features:
-            self._setup_pwa()
-            
-        if "i18n" in self.features:
-            self._setup_i18n()
-        
-        return True
-    
-    def _setup_tailwind(self):
-        """Set up Tailwind CSS."""
-        # Create src directory if it doesn't exist
-        src_dir = self.target_dir / "src"
-        src_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Add Tailwind CSS configuration
-        css_content = """@tailwind base;
+# create-vue flags enabled by each feature
+_CREATE_VUE_FLAGS = (
+    ("TypeScript", "--typescript"),
+    ("JSX", "--jsx"),
+    ("Vue Router", "--router"),
+    ("Pinia", "--pinia"),
+    ("Vitest", "--vitest"),
+    ("Cypress", "--cypress"),
+    ("ESLint", "--eslint"),
+    ("Prettier", "--prettier"),
+)
+
+_POSTCSS_CONFIG = """export default {
+  plugins: {
+    tailwindcss: {},
+    autoprefixer: {},
+  },
+}
+"""
+
+_STYLE_CSS = """@tailwind base;
 @tailwind components;
 @tailwind utilities;
 """
-        self._write_file(self.target_dir / "src" / "style.css", css_content)
-        
-        # Install Tailwind and its dependencies
-        self._run_command([
-            "npm",
-            "install",
-            "-D",
-            "tailwindcss",
-            "postcss",
-            "autoprefixer"
-        ])
-        
-        # Initialize Tailwind
-        self._run_command(["npx", "tailwindcss", "init", "-p"])
-        
-        # Update tailwind.config.js
-        config_content = """/** @type {import('tailwindcss').Config} */
+
+_TAILWIND_CONFIG = """/** @type {import('tailwindcss').Config} */
 export default {
   content: [
     "./index.html",
@@ -89,20 +37,8 @@ export default {
   plugins: [],
 }
 """
-        self._write_file(self.target_dir / "tailwind.config.js", config_content)
-    
-    def _setup_pwa(self):
-        """Set up PWA support."""
-        # Install Vite PWA plugin
-        self._run_command([
-            "npm",
-            "install",
-            "-D",
-            "vite-plugin-pwa"
-        ])
-        
-        # Update vite.config.ts/js
-        vite_config = """import { defineConfig } from 'vite'
+
+_VITE_CONFIG_PWA = """import { defineConfig } from 'vite'
 import vue from '@vitejs/plugin-vue'
 import { VitePWA } from 'vite-plugin-pwa'
 
@@ -134,22 +70,8 @@ export default defineConfig({
   ]
 })
 """
-        self._write_file(
-            self.target_dir / ("vite.config.ts" if "TypeScript" in self.features else "vite.config.js"),
-            vite_config
-        )
-    
-    def _setup_i18n(self):
-        """Set up Vue I18n for internationalization."""
-        # Install Vue I18n
-        self._run_command([
-            "npm",
-            "install",
-            "vue-i18n@9"
-        ])
-        
-        # Create i18n configuration
-        i18n_config = """import { createI18n } from 'vue-i18n'
+
+_I18N_CONFIG = """import { createI18n } from 'vue-i18n'
 
 const messages = {
   en: {
@@ -171,13 +93,8 @@ export const i18n = createI18n({
   messages,
 })
 """
-        self._write_file(
-            self.target_dir / "src" / "i18n" / ("index.ts" if "TypeScript" in self.features else "index.js"),
-            i18n_config
-        )
-        
-        # Update main.ts/js to use i18n
-        main_content = """import { createApp } from 'vue'
+
+_MAIN_I18N = """import { createApp } from 'vue'
 import App from './App.vue'
 import { i18n } from './i18n'
 
@@ -185,7 +102,110 @@ const app = createApp(App)
 app.use(i18n)
 app.mount('#app')
 """
-        self._write_file(
-            self.target_dir / "src" / ("main.ts" if "TypeScript" in self.features else "main.js"),
-            main_content
+
+class VueTemplate(BaseTemplate):
+    def generate(self):
+        """Generate a Vue 3 project using Vite."""
+        # Create project using create-vue in the parent directory
+        parent_dir = self.target_dir.parent
+        
+        # Ensure parent directory exists
+        parent_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Build create-vue command with selected features
+        cmd = [
+            "npm",
+            "create",
+            "vue@latest",
+            str(self.project_name),
+            "--",
+            *(flag for feature, flag in _CREATE_VUE_FLAGS if feature in self._features),
+        ]
+        
+        # Reuse the output of an earlier create-vue run with the same
+        # flags when available
+        archive = self._scaffold_archive(*cmd[5:])
+        if not self._restore_scaffold(archive):
+            success = self._run_command(cmd, cwd=parent_dir)
+            if not success:
+                return False
+            self._save_scaffold(archive)
+        
+        # Install dependencies. Any npm install also installs the scaffold's
+        # own dependencies, so the plain install is only needed without
+        # other packages
+        packages, dev_packages = self._collect_packages()
+        if packages or not dev_packages:
+            self._run_command(self._npm_install_command(*packages), self.target_dir)
+        
+        if dev_packages:
+            self._run_command(self._npm_install_command(*dev_packages, dev=True), self.target_dir)
+        
+        # Add additional features
+        if "Tailwind CSS" in self._features:
+            self._setup_tailwind()
+            
+        if "PWA" in self._features:
+            self._setup_pwa()
+            
+        if "i18n" in self._features:
+            self._setup_i18n()
+        
+        # The feature setup steps only queue their files; write them together
+        self._flush_files()
+        return True
+    
+    def _collect_packages(self):
+        """Return the runtime and dev packages the selected features need."""
+        packages = []
+        dev_packages = []
+        
+        if "Tailwind CSS" in self._features:
+            dev_packages.extend(["tailwindcss", "postcss", "autoprefixer"])
+        
+        if "PWA" in self._features:
+            dev_packages.append("vite-plugin-pwa")
+        
+        if "i18n" in self._features:
+            packages.append("vue-i18n@9")
+        
+        return packages, dev_packages
+    
+    def _setup_tailwind(self):
+        """Set up Tailwind CSS."""
+        # Create src directory if it doesn't exist
+        src_dir = self.target_dir / "src"
+        src_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Add Tailwind CSS configuration
+        self._queue_file(self.target_dir / "src" / "style.css", _STYLE_CSS)
+        
+        # Write what `tailwindcss init -p` would create
+        self._queue_file(self.target_dir / "postcss.config.js", _POSTCSS_CONFIG)
+        
+        # Update tailwind.config.js
+        self._queue_file(self.target_dir / "tailwind.config.js", _TAILWIND_CONFIG)
+    
+    def _setup_pwa(self):
+        """Set up PWA support."""
+        # Update vite.config.ts/js
+        self._queue_file(
+            self.target_dir / ("vite.config.ts" if "TypeScript" in self._features else "vite.config.js"),
+            _VITE_CONFIG_PWA
+        )
+    
+    def _setup_i18n(self):
+        """Set up Vue I18n for internationalization."""
+        self._create_directory(self.target_dir / "src" / "i18n")
+        
+        # Create i18n configuration
+        self._queue_file(
+            self.target_dir / "src" / "i18n" / ("index.ts" if "TypeScript" in self._features else "index.js"),
+            _I18N_CONFIG
+        )
+        
+        # Update main.ts/js to use i18n
+        self._queue_file(
+            self.target_dir / "src" / ("main.ts" if "TypeScript" in self._features else "main.js"),
+            _MAIN_I18N
         ) 
\ No newline at end of file
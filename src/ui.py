@@ -1,20 +1,59 @@
-from typing import List, Dict, Any
+from functools import lru_cache
+from typing import List
 import questionary
-from rich.console import Console
+from rich.console import Console, Group, NewLine
 from rich.panel import Panel
-from rich.style import Style
 from rich import box
 from rich.text import Text
 
 console = Console()
 
+@lru_cache(maxsize=32)
+def _build_panel(text: str, color: str) -> Group:
+    """Build (once per text and color) a heavy bordered panel between blank lines."""
+    # Grouped with its surrounding blank lines so it is printed in one write
+    return Group(
+        NewLine(),
+        Panel(
+            Text(text, style=f"{color} bold", justify="center"),
+            box=box.HEAVY,
+            border_style=color,
+            padding=(1, 2)
+        ),
+        NewLine()
+    )
+
+_SEPARATOR = {"name": "─" * 50, "value": None, "disabled": True}
+
+def _described_choice(item: dict) -> dict:
+    """Build a select choice showing an item's description under its name."""
+    return {
+        "name": f"{item['display']}\n   {item['description']}",
+        "value": item["value"]
+    }
+
+def _grouped_template_choices(templates: List[dict]) -> List[dict]:
+    """Build template choices grouped into Frontend, Backend and Full-stack."""
+    groups = {"📱 Frontend": [], "⚙️  Backend": [], "🎯 Full-stack": []}
+    for template in templates:
+        if "Frontend" in template["name"]:
+            groups["📱 Frontend"].append(template)
+        elif "Backend" in template["name"] or "API" in template["name"]:
+            groups["⚙️  Backend"].append(template)
+        else:
+            groups["🎯 Full-stack"].append(template)
+
+    choices = []
+    for heading, members in groups.items():
+        if not members:
+            continue
+        if choices:
+            choices.append(_SEPARATOR)
+        choices.append({"name": heading, "value": None, "disabled": True})
+        choices.extend(_described_choice(template) for template in members)
+    return choices
+
 class UI:
-    # Styles
-    HEADER_STYLE = Style(color="cyan", bold=True)
-    SUCCESS_STYLE = Style(color="green", bold=True)
-    ERROR_STYLE = Style(color="red", bold=True)
-    INFO_STYLE = Style(color="yellow")
-    
     # Project Categories
     PROJECT_CATEGORIES = [
         {
@@ -263,386 +302,241 @@ class UI:
         }
     ]
 
+    # Prompt styles, parsed once
+    _INPUT_STYLE = questionary.Style([
+        ('qmark', 'fg:cyan bold'),
+        ('question', 'fg:white bold'),
+        ('pointer', 'fg:cyan bold'),
+        ('highlighted', 'fg:cyan bold'),
+        ('selected', 'fg:green bold')
+    ])
+
+    _SELECT_STYLE = questionary.Style([
+        *_INPUT_STYLE.style_rules,
+        ('separator', 'fg:grey'),
+        ('disabled', 'fg:grey')
+    ])
+
+    # Prompt choices, built once from the tables above
+    _CATEGORY_CHOICES = []
+    for _category in PROJECT_CATEGORIES:
+        if _CATEGORY_CHOICES:
+            _CATEGORY_CHOICES.append(_SEPARATOR)
+        _CATEGORY_CHOICES.append(_described_choice(_category))
+    del _category
+
+    _PROJECT_TYPE_CHOICES = {
+        category: _grouped_template_choices(templates)
+        for category, templates in PROJECT_TEMPLATES.items()
+    }
+
+    # Feature choices by project type
+    _REACT_FEATURES = [
+        {"name": "⚡ TypeScript", "value": "TypeScript", "checked": True},
+        {"name": "🎨 Tailwind CSS", "value": "Tailwind CSS"},
+        {"name": "🔍 ESLint", "value": "ESLint"},
+        {"name": "✨ Prettier", "value": "Prettier"}
+    ]
+
+    _NEXT_FEATURES = [
+        {"name": "📱 PWA Support", "value": "PWA"},
+        {"name": "🔄 API Routes", "value": "API Routes"},
+        {"name": "📊 MongoDB (with Prisma)", "value": "MongoDB"}
+    ]
+
+    _SUPABASE_FEATURES = [
+        {"name": "🔐 Authentication", "value": "Authentication"},
+        {"name": "📊 Database Helpers", "value": "Database Helpers"},
+        {"name": "📁 Storage Helpers", "value": "Storage Helpers"}
+    ]
+
+    _FEATURE_CHOICES = {
+        "React Frontend": _REACT_FEATURES,
+        "React + Supabase": _REACT_FEATURES + _SUPABASE_FEATURES,
+        "Vue Frontend": [
+            {"name": "⚡ TypeScript", "value": "TypeScript", "checked": True},
+            {"name": "🎨 Tailwind CSS", "value": "Tailwind CSS"},
+            {"name": "🔍 ESLint", "value": "ESLint"},
+            {"name": "✨ Prettier", "value": "Prettier"},
+            {"name": "🛣️ Vue Router", "value": "Vue Router"},
+            {"name": "📦 Pinia (State Management)", "value": "Pinia"},
+            {"name": "🧪 Vitest", "value": "Vitest"},
+            {"name": "🔄 Cypress", "value": "Cypress"},
+            {"name": "📱 PWA Support", "value": "PWA"},
+            {"name": "🌐 i18n", "value": "i18n"},
+            {"name": "⚛️ JSX", "value": "JSX"}
+        ],
+        "Django Full-stack": [
+            {"name": "🐘 PostgreSQL", "value": "PostgreSQL"},
+            {"name": "🎲 MySQL", "value": "MySQL"},
+            {"name": "🔐 Authentication", "value": "Authentication"},
+            {"name": "🚀 DRF (Django REST Framework)", "value": "DRF"},
+            {"name": "📝 API Docs (drf-spectacular)", "value": "API Docs"},
+            {"name": "🔄 CORS Headers", "value": "CORS"},
+            {"name": "🐞 Debug Toolbar", "value": "Debug Toolbar"},
+            {"name": "🔧 Django Extensions", "value": "Django Extensions"},
+            {"name": "📦 Celery", "value": "Celery"},
+            {"name": "📊 Redis", "value": "Redis"},
+            {"name": "🐳 Docker", "value": "Docker"},
+            {"name": "🧪 Testing", "value": "Testing"},
+            {"name": "📄 WhiteNoise", "value": "WhiteNoise"},
+            {"name": "🚀 Production Ready", "value": "Production"}
+        ],
+        "T3 Stack": [
+            {"name": "🔐 NextAuth.js", "value": "NextAuth", "checked": True},
+            {"name": "📊 Prisma", "value": "Prisma", "checked": True},
+            {"name": "🎨 Tailwind CSS", "value": "Tailwind CSS", "checked": True},
+            {"name": "🔍 ESLint", "value": "ESLint", "checked": True},
+            {"name": "✨ Prettier", "value": "Prettier", "checked": True},
+            {"name": "📱 PWA Support", "value": "PWA"},
+            {"name": "🎭 Jest Testing", "value": "Jest"},
+            {"name": "🎮 tRPC Subscriptions", "value": "tRPC-Sub"},
+            {"name": "📈 Prisma Studio UI", "value": "Prisma-Studio"}
+        ],
+        "FastAPI Backend": [
+            {"name": "🔐 JWT Authentication", "value": "JWT", "checked": True},
+            {"name": "📊 SQLAlchemy ORM", "value": "SQLAlchemy", "checked": True},
+            {"name": "📝 Pydantic Models", "value": "Pydantic", "checked": True},
+            {"name": "🧪 pytest", "value": "pytest", "checked": True},
+            {"name": "🔍 Black + Flake8", "value": "Linting", "checked": True},
+            {"name": "📦 Poetry", "value": "Poetry"},
+            {"name": "🐳 Docker", "value": "Docker"},
+            {"name": "🔄 Alembic Migrations", "value": "Alembic"},
+            {"name": "📈 Prometheus Metrics", "value": "Prometheus"},
+            {"name": "📝 API Documentation", "value": "API-Docs"}
+        ],
+        "Express API": [
+            {"name": "⚡ TypeScript", "value": "TypeScript", "checked": True},
+            {"name": "📊 Prisma ORM", "value": "Prisma", "checked": True},
+            {"name": "🔐 JWT Auth", "value": "JWT", "checked": True},
+            {"name": "📝 OpenAPI/Swagger", "value": "OpenAPI", "checked": True},
+            {"name": "🧪 Jest Testing", "value": "Jest", "checked": True},
+            {"name": "🔍 ESLint", "value": "ESLint", "checked": True},
+            {"name": "✨ Prettier", "value": "Prettier", "checked": True},
+            {"name": "🐳 Docker", "value": "Docker"},
+            {"name": "📈 Prometheus Metrics", "value": "Prometheus"},
+            {"name": "🔄 Rate Limiting", "value": "Rate-Limit"}
+        ],
+        "Python Project": [
+            {"name": "✨ Black", "value": "Black", "checked": True},
+            {"name": "🔍 Flake8", "value": "Flake8", "checked": True},
+            {"name": "🧪 pytest", "value": "pytest", "checked": True},
+            {"name": "🔄 pre-commit hooks", "value": "pre-commit hooks"},
+            {"name": "🐳 Docker setup", "value": "Docker setup"}
+        ]
+    }
+
+    # Next.js adds its own features between the React and Supabase ones
+    _NEXT_FEATURE_CHOICES = {
+        "React Frontend": _REACT_FEATURES + _NEXT_FEATURES,
+        "React + Supabase": _REACT_FEATURES + _NEXT_FEATURES + _SUPABASE_FEATURES
+    }
+
     @staticmethod
-    def print_header(text: str):
+    def _print_panel(text: str, color: str):
+        """Print text in a heavy bordered panel."""
+        console.print(_build_panel(text, color))
+
+    @classmethod
+    def print_header(cls, text: str):
         """Print a styled header."""
-        console.print()
-        console.print(Panel(
-            Text(text, style="cyan bold", justify="center"),
-            box=box.HEAVY,
-            border_style="cyan",
-            padding=(1, 2)
-        ))
-        console.print()
+        cls._print_panel(text, "cyan")
 
-    @staticmethod
-    def print_success(text: str):
+    @classmethod
+    def print_success(cls, text: str):
         """Print a success message."""
-        console.print()
-        console.print(Panel(
-            Text(f"✨ {text} 🚀", style="green bold", justify="center"),
-            box=box.HEAVY,
-            border_style="green",
-            padding=(1, 2)
-        ))
-        console.print()
+        cls._print_panel(f"✨ {text} 🚀", "green")
 
-    @staticmethod
-    def print_error(text: str):
+    @classmethod
+    def print_error(cls, text: str):
         """Print an error message."""
-        console.print()
-        console.print(Panel(
-            Text(f"❌ {text}", style="red bold", justify="center"),
-            box=box.HEAVY,
-            border_style="red",
-            padding=(1, 2)
-        ))
-        console.print()
+        cls._print_panel(f"❌ {text}", "red")
 
-    @staticmethod
-    def print_info(text: str):
+    @classmethod
+    def print_info(cls, text: str):
         """Print an info message."""
-        console.print()
-        console.print(Panel(
-            Text(f"ℹ️  {text}", style="yellow bold", justify="center"),
-            box=box.HEAVY,
-            border_style="yellow",
-            padding=(1, 2)
-        ))
-        console.print()
+        cls._print_panel(f"ℹ️  {text}", "yellow")
 
     @classmethod
     def select_category(cls) -> str:
         """Prompt for project category selection."""
-        console.print()
-        console.print(Panel(
-            Text("Select Project Category", style="cyan bold", justify="center"),
-            box=box.HEAVY,
-            border_style="cyan",
-            padding=(1, 2)
-        ))
-        console.print()
-        
-        choices = []
-        for category in cls.PROJECT_CATEGORIES:
-            # Add a separator before each category except the first one
-            if choices:
-                choices.append({"name": "─" * 50, "value": None, "disabled": True})
-            
-            description = Text()
-            description.append(f"\n   {category['description']}", style="dim")
-            
-            choices.append({
-                "name": f"{category['display']}{description}",
-                "value": category["value"]
-            })
+        cls._print_panel("Select Project Category", "cyan")
         
         return questionary.select(
             "Choose a category:",
-            choices=choices,
+            choices=cls._CATEGORY_CHOICES,
             qmark="📂",
             pointer="➜",
-            style=questionary.Style([
-                ('qmark', 'fg:cyan bold'),
-                ('question', 'fg:white bold'),
-                ('pointer', 'fg:cyan bold'),
-                ('highlighted', 'fg:cyan bold'),
-                ('selected', 'fg:green bold'),
-                ('separator', 'fg:grey'),
-                ('disabled', 'fg:grey')
-            ])
+            style=cls._SELECT_STYLE
         ).ask()
 
     @classmethod
     def select_project_type(cls, category: str) -> str:
         """Prompt for project type selection within a category."""
-        console.print()
-        console.print(Panel(
-            Text("Select Project Type", style="cyan bold", justify="center"),
-            box=box.HEAVY,
-            border_style="cyan",
-            padding=(1, 2)
-        ))
-        console.print()
-        
-        choices = []
-        templates = cls.PROJECT_TEMPLATES.get(category, [])
-        
-        # Group templates by type
-        frontend_templates = []
-        backend_templates = []
-        fullstack_templates = []
-        
-        for template in templates:
-            if "Frontend" in template["name"]:
-                frontend_templates.append(template)
-            elif "Backend" in template["name"] or "API" in template["name"]:
-                backend_templates.append(template)
-            else:
-                fullstack_templates.append(template)
-        
-        # Add Frontend templates
-        if frontend_templates:
-            if choices:
-                choices.append({"name": "─" * 50, "value": None, "disabled": True})
-            choices.append({"name": "📱 Frontend", "value": None, "disabled": True})
-            for template in frontend_templates:
-                description = Text()
-                description.append(f"\n   {template['description']}", style="dim")
-                choices.append({
-                    "name": f"{template['display']}{description}",
-                    "value": template["value"]
-                })
-        
-        # Add Backend templates
-        if backend_templates:
-            if choices:
-                choices.append({"name": "─" * 50, "value": None, "disabled": True})
-            choices.append({"name": "⚙️  Backend", "value": None, "disabled": True})
-            for template in backend_templates:
-                description = Text()
-                description.append(f"\n   {template['description']}", style="dim")
-                choices.append({
-                    "name": f"{template['display']}{description}",
-                    "value": template["value"]
-                })
-        
-        # Add Full-stack templates
-        if fullstack_templates:
-            if choices:
-                choices.append({"name": "─" * 50, "value": None, "disabled": True})
-            choices.append({"name": "🎯 Full-stack", "value": None, "disabled": True})
-            for template in fullstack_templates:
-                description = Text()
-                description.append(f"\n   {template['description']}", style="dim")
-                choices.append({
-                    "name": f"{template['display']}{description}",
-                    "value": template["value"]
-                })
+        cls._print_panel("Select Project Type", "cyan")
         
         return questionary.select(
             "Choose a template:",
-            choices=choices,
+            choices=cls._PROJECT_TYPE_CHOICES.get(category, []),
             qmark="🎯",
             pointer="➜",
-            style=questionary.Style([
-                ('qmark', 'fg:cyan bold'),
-                ('question', 'fg:white bold'),
-                ('pointer', 'fg:cyan bold'),
-                ('highlighted', 'fg:cyan bold'),
-                ('selected', 'fg:green bold'),
-                ('separator', 'fg:grey'),
-                ('disabled', 'fg:grey')
-            ])
+            style=cls._SELECT_STYLE
         ).ask()
 
-    @staticmethod
-    def get_project_name(default: str = None) -> str:
+    @classmethod
+    def get_project_name(cls, default: str = None) -> str:
         """Prompt for project name."""
-        console.print()
-        console.print(Panel(
-            Text("Project Configuration", style="cyan bold", justify="center"),
-            box=box.HEAVY,
-            border_style="cyan",
-            padding=(1, 2)
-        ))
-        console.print()
+        cls._print_panel("Project Configuration", "cyan")
         
         return questionary.text(
             "Enter project name:",
             default=default or "",
             qmark="💡",
-            style=questionary.Style([
-                ('qmark', 'fg:cyan bold'),
-                ('question', 'fg:white bold'),
-                ('pointer', 'fg:cyan bold'),
-                ('highlighted', 'fg:cyan bold'),
-                ('selected', 'fg:green bold')
-            ])
+            style=cls._INPUT_STYLE
         ).ask()
 
     @classmethod
     def select_react_framework(cls) -> str:
         """Prompt for React framework selection."""
-        console.print()
-        console.print(Panel(
-            Text("Select Framework", style="cyan bold", justify="center"),
-            box=box.HEAVY,
-            border_style="cyan",
-            padding=(1, 2)
-        ))
-        console.print()
+        cls._print_panel("Select Framework", "cyan")
         
         return questionary.select(
             "Choose a framework:",
             choices=cls.REACT_FRAMEWORKS,
             qmark="📦",
             pointer="➜",
-            style=questionary.Style([
-                ('qmark', 'fg:cyan bold'),
-                ('question', 'fg:white bold'),
-                ('pointer', 'fg:cyan bold'),
-                ('highlighted', 'fg:cyan bold'),
-                ('selected', 'fg:green bold'),
-                ('separator', 'fg:grey'),
-                ('disabled', 'fg:grey')
-            ])
+            style=cls._SELECT_STYLE
         ).ask()
 
     @classmethod
     def select_features(cls, project_type: str, framework: str = None) -> List[str]:
         """Prompt for feature selection based on project type."""
-        choices = []
-        
-        if project_type in ["React Frontend", "React + Supabase"]:
-            # Base React features
-            choices = [
-                {"name": "⚡ TypeScript", "value": "TypeScript", "checked": True},
-                {"name": "🎨 Tailwind CSS", "value": "Tailwind CSS"},
-                {"name": "🔍 ESLint", "value": "ESLint"},
-                {"name": "✨ Prettier", "value": "Prettier"}
-            ]
-
-            # Next.js specific features
-            if framework == "next":
-                choices.extend([
-                    {"name": "📱 PWA Support", "value": "PWA"},
-                    {"name": "🔄 API Routes", "value": "API Routes"},
-                    {"name": "📊 MongoDB (with Prisma)", "value": "MongoDB"}
-                ])
-            
-            # Supabase specific features
-            if project_type == "React + Supabase":
-                choices.extend([
-                    {"name": "🔐 Authentication", "value": "Authentication"},
-                    {"name": "📊 Database Helpers", "value": "Database Helpers"},
-                    {"name": "📁 Storage Helpers", "value": "Storage Helpers"}
-                ])
-
-        elif project_type == "Vue Frontend":
-            choices = [
-                {"name": "⚡ TypeScript", "value": "TypeScript", "checked": True},
-                {"name": "🎨 Tailwind CSS", "value": "Tailwind CSS"},
-                {"name": "🔍 ESLint", "value": "ESLint"},
-                {"name": "✨ Prettier", "value": "Prettier"},
-                {"name": "🛣️ Vue Router", "value": "Vue Router"},
-                {"name": "📦 Pinia (State Management)", "value": "Pinia"},
-                {"name": "🧪 Vitest", "value": "Vitest"},
-                {"name": "🔄 Cypress", "value": "Cypress"},
-                {"name": "📱 PWA Support", "value": "PWA"},
-                {"name": "🌐 i18n", "value": "i18n"},
-                {"name": "⚛️ JSX", "value": "JSX"}
-            ]
-
-        elif project_type == "Django Full-stack":
-            choices = [
-                {"name": "🐘 PostgreSQL", "value": "PostgreSQL"},
-                {"name": "🎲 MySQL", "value": "MySQL"},
-                {"name": "🔐 Authentication", "value": "Authentication"},
-                {"name": "🚀 DRF (Django REST Framework)", "value": "DRF"},
-                {"name": "📝 API Docs (drf-spectacular)", "value": "API Docs"},
-                {"name": "🔄 CORS Headers", "value": "CORS"},
-                {"name": "🐞 Debug Toolbar", "value": "Debug Toolbar"},
-                {"name": "🔧 Django Extensions", "value": "Django Extensions"},
-                {"name": "📦 Celery", "value": "Celery"},
-                {"name": "📊 Redis", "value": "Redis"},
-                {"name": "🐳 Docker", "value": "Docker"},
-                {"name": "🧪 Testing", "value": "Testing"},
-                {"name": "📄 WhiteNoise", "value": "WhiteNoise"},
-                {"name": "🚀 Production Ready", "value": "Production"}
-            ]
-
-        elif project_type == "T3 Stack":
-            choices = [
-                {"name": "🔐 NextAuth.js", "value": "NextAuth", "checked": True},
-                {"name": "📊 Prisma", "value": "Prisma", "checked": True},
-                {"name": "🎨 Tailwind CSS", "value": "Tailwind CSS", "checked": True},
-                {"name": "🔍 ESLint", "value": "ESLint", "checked": True},
-                {"name": "✨ Prettier", "value": "Prettier", "checked": True},
-                {"name": "📱 PWA Support", "value": "PWA"},
-                {"name": "🎭 Jest Testing", "value": "Jest"},
-                {"name": "🎮 tRPC Subscriptions", "value": "tRPC-Sub"},
-                {"name": "📈 Prisma Studio UI", "value": "Prisma-Studio"}
-            ]
-
-        elif project_type == "FastAPI Backend":
-            choices = [
-                {"name": "🔐 JWT Authentication", "value": "JWT", "checked": True},
-                {"name": "📊 SQLAlchemy ORM", "value": "SQLAlchemy", "checked": True},
-                {"name": "📝 Pydantic Models", "value": "Pydantic", "checked": True},
-                {"name": "🧪 pytest", "value": "pytest", "checked": True},
-                {"name": "🔍 Black + Flake8", "value": "Linting", "checked": True},
-                {"name": "📦 Poetry", "value": "Poetry"},
-                {"name": "🐳 Docker", "value": "Docker"},
-                {"name": "🔄 Alembic Migrations", "value": "Alembic"},
-                {"name": "📈 Prometheus Metrics", "value": "Prometheus"},
-                {"name": "📝 API Documentation", "value": "API-Docs"}
-            ]
-
-        elif project_type == "Express API":
-            choices = [
-                {"name": "⚡ TypeScript", "value": "TypeScript", "checked": True},
-                {"name": "📊 Prisma ORM", "value": "Prisma", "checked": True},
-                {"name": "🔐 JWT Auth", "value": "JWT", "checked": True},
-                {"name": "📝 OpenAPI/Swagger", "value": "OpenAPI", "checked": True},
-                {"name": "🧪 Jest Testing", "value": "Jest", "checked": True},
-                {"name": "🔍 ESLint", "value": "ESLint", "checked": True},
-                {"name": "✨ Prettier", "value": "Prettier", "checked": True},
-                {"name": "🐳 Docker", "value": "Docker"},
-                {"name": "📈 Prometheus Metrics", "value": "Prometheus"},
-                {"name": "🔄 Rate Limiting", "value": "Rate-Limit"}
-            ]
-        
-        elif project_type == "Python Project":
-            choices = [
-                {"name": "✨ Black", "value": "Black", "checked": True},
-                {"name": "🔍 Flake8", "value": "Flake8", "checked": True},
-                {"name": "🧪 pytest", "value": "pytest", "checked": True},
-                {"name": "🔄 pre-commit hooks", "value": "pre-commit hooks"},
-                {"name": "🐳 Docker setup", "value": "Docker setup"}
-            ]
+        choices = None
+        if framework == "next":
+            choices = cls._NEXT_FEATURE_CHOICES.get(project_type)
+        if choices is None:
+            choices = cls._FEATURE_CHOICES.get(project_type)
         
         if not choices:
             return []
         
-        console.print()
-        console.print(Panel(
-            Text("Configure Features", style="cyan bold", justify="center"),
-            box=box.HEAVY,
-            border_style="cyan",
-            padding=(1, 2)
-        ))
-        console.print()
+        cls._print_panel("Configure Features", "cyan")
         
         return questionary.checkbox(
             "Select features to include:",
             choices=choices,
             qmark="🛠️ ",
             pointer="➜",
-            style=questionary.Style([
-                ('qmark', 'fg:cyan bold'),
-                ('question', 'fg:white bold'),
-                ('pointer', 'fg:cyan bold'),
-                ('highlighted', 'fg:cyan bold'),
-                ('selected', 'fg:green bold'),
-                ('separator', 'fg:grey'),
-                ('disabled', 'fg:grey')
-            ])
+            style=cls._SELECT_STYLE
         ).ask() or []
 
-    @staticmethod
-    def confirm(message: str) -> bool:
+    @classmethod
+    def confirm(cls, message: str) -> bool:
         """Prompt for confirmation."""
         console.print()
         return questionary.confirm(
             message,
             qmark="❓",
             default=False,
-            style=questionary.Style([
-                ('qmark', 'fg:cyan bold'),
-                ('question', 'fg:white bold'),
-                ('pointer', 'fg:cyan bold'),
-                ('highlighted', 'fg:cyan bold'),
-                ('selected', 'fg:green bold')
-            ])
+            style=cls._INPUT_STYLE
         ).ask()
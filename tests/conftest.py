@@ -1,16 +1,18 @@
 """Pytest configuration and shared fixtures."""
-import os
 import shutil
-import tempfile
-from pathlib import Path
+from types import SimpleNamespace
 import pytest
 
+def pytest_addoption(parser):
+    parser.addoption(
+        "--all-combinations", action="store_true",
+        help="test every combination of template features instead of a pairwise selection"
+    )
+
 @pytest.fixture
-def temp_dir():
+def temp_dir(tmp_path):
     """Create a temporary directory for testing."""
-    temp_dir = tempfile.mkdtemp()
-    yield Path(temp_dir)
-    shutil.rmtree(temp_dir)
+    return tmp_path
 
 @pytest.fixture
 def mock_config(temp_dir):
@@ -20,12 +22,48 @@ def mock_config(temp_dir):
         "ide": "cursor"
     }
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_features():
     """Return a set of mock features for testing templates."""
-    return [
+    # A tuple, so tests sharing it cannot mutate it
+    return (
         "TypeScript",
         "Tailwind CSS",
         "ESLint",
         "Prettier"
-    ] 
\ No newline at end of file
+    )
+
+@pytest.fixture(autouse=True)
+def flow_dir(tmp_path_factory, monkeypatch):
+    """Keep cached scaffolds, node_modules and lock files out of the real home directory."""
+    flow_dir = tmp_path_factory.mktemp("flow")
+    monkeypatch.setattr("src.config._CONFIG_DIR", flow_dir)
+    return flow_dir
+
+@pytest.fixture(autouse=True)
+def detached_rmtree(monkeypatch):
+    """Record and delete trees failed generations hand to a detached rmtree process instead of starting one."""
+    paths = []
+    def rmtree(path):
+        paths.append(path)
+        shutil.rmtree(path, ignore_errors=True)
+    monkeypatch.setattr("src.templates.base._rmtree_detached", rmtree)
+    return paths
+
+class RunRecorder:
+    """Stand-in for subprocess.run that records each command and succeeds."""
+    def __init__(self):
+        self.argvs = []
+        self.kwargs = []
+    
+    def __call__(self, args, **kwargs):
+        self.argvs.append(list(args))
+        self.kwargs.append(kwargs)
+        return SimpleNamespace(returncode=0)
+
+@pytest.fixture
+def fake_run(monkeypatch):
+    """Replace subprocess.run with a RunRecorder."""
+    recorder = RunRecorder()
+    monkeypatch.setattr("subprocess.run", recorder)
+    return recorder
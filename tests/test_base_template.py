@@ -2,13 +2,19 @@
 import pytest
 from pathlib import Path
 from unittest.mock import patch, MagicMock, call
+from types import SimpleNamespace
 import subprocess
 import signal
 import sys
+import os
 import shutil
-from src.templates.base import BaseTemplate
+import time
+from src.templates.base import BaseTemplate, _handle_interrupt, _rmtree_detached, _MODULES_TTL
 from typing import List
 
+# subprocess.run result for commands that succeed; only returncode is read
+COMPLETED = SimpleNamespace(returncode=0)
+
 # Mock implementation of BaseTemplate for testing
 def create_mock_template(project_name: str, features: List[str], target_dir: Path) -> BaseTemplate:
     class MockTemplate(BaseTemplate):
@@ -22,6 +28,16 @@ def temp_dir(tmp_path):
     """Create a temporary directory for testing."""
     return tmp_path
 
+@pytest.fixture(autouse=True)
+def fake_signal(monkeypatch):
+    """Keep templates from replacing the process's real SIGINT handler."""
+    handlers = {}
+    fake = MagicMock(SIGINT=signal.SIGINT)
+    fake.getsignal.side_effect = handlers.get
+    fake.signal.side_effect = handlers.__setitem__
+    monkeypatch.setattr('src.templates.base.signal', fake)
+    return fake
+
 @pytest.fixture
 def template(temp_dir):
     """Create a test template instance."""
@@ -43,13 +59,69 @@ def test_cleanup(template, temp_dir):
     template._cleanup()
     assert not temp_dir.exists()
 
-def test_cleanup_error(template, temp_dir):
+def test_cleanup_missing_directory(temp_dir, capsys):
+    """Test cleanup when the target directory was never created."""
+    template = create_mock_template("test_project", [], temp_dir / "missing")
+    
+    template._cleanup()
+    output = capsys.readouterr().out
+    assert "Cleaned up" not in output
+    assert "Error" not in output
+
+def test_cleanup_error(template, temp_dir, monkeypatch):
     """Test cleanup with error."""
-    with patch('shutil.rmtree') as mock_rmtree:
-        mock_rmtree.side_effect = PermissionError("Permission denied")
-        
-        # Should not raise an exception
+    monkeypatch.setattr('shutil.rmtree', MagicMock(side_effect=PermissionError("Permission denied")))
+    
+    # Should not raise an exception
+    template._cleanup()
+
+def test_cleanup_not_reentrant(template, temp_dir, fake_signal):
+    """Test that an interrupt during cleanup does not start a second removal."""
+    def interrupted_rmtree(path):
+        handler = fake_signal.getsignal(signal.SIGINT)
+        handler(signal.SIGINT, None)
+    
+    with patch('shutil.rmtree', side_effect=interrupted_rmtree) as mock_rmtree, \
+         patch('sys.exit') as mock_exit:
         template._cleanup()
+        
+        mock_rmtree.assert_called_once()
+        mock_exit.assert_not_called()
+
+def test_cleanup_async(temp_dir, capsys, detached_rmtree):
+    """Test that background cleanup frees the target path immediately."""
+    target = temp_dir / "project"
+    (target / "node_modules" / "pkg").mkdir(parents=True)
+    template = create_mock_template("project", [], target)
+    
+    template._cleanup_async()
+    
+    assert not target.exists()
+    [trash] = detached_rmtree
+    assert trash.parent == temp_dir and trash.name == f".project.{os.getpid()}.trash"
+    assert "Cleaned up directory" in capsys.readouterr().out
+
+def test_cleanup_async_missing_directory(temp_dir, detached_rmtree):
+    """Test that background cleanup of a missing directory does nothing."""
+    template = create_mock_template("project", [], temp_dir / "missing")
+    
+    template._cleanup_async()
+    assert detached_rmtree == []
+
+def test_rmtree_detached(temp_dir):
+    """Test that trees are deleted from a detached Python process."""
+    with patch('subprocess.Popen') as mock_popen:
+        _rmtree_detached(temp_dir / "trash")
+    
+    args = mock_popen.call_args[0][0]
+    assert args[0] == sys.executable and args[-1] == str(temp_dir / "trash")
+
+def test_rmtree_detached_fallback(temp_dir):
+    """Test that trees are deleted in-process when no process can be started."""
+    (temp_dir / "trash" / "pkg").mkdir(parents=True)
+    with patch('subprocess.Popen', side_effect=OSError):
+        _rmtree_detached(temp_dir / "trash")
+    assert not (temp_dir / "trash").exists()
 
 def test_create_directory(template, temp_dir):
     """Test directory creation."""
@@ -76,6 +148,38 @@ def test_write_file(template, temp_dir):
     assert test_file.exists()
     assert test_file.read_text() == content
 
+def test_write_file_unchanged(template, temp_dir):
+    """Test that files already holding the content are not rewritten."""
+    text_file = temp_dir / "test.txt"
+    text_file.write_text("same\r\n")
+    bytes_file = temp_dir / "test.bin"
+    bytes_file.write_bytes(b"same")
+    
+    with patch('pathlib.Path.write_text') as mock_write_text, \
+         patch('pathlib.Path.write_bytes') as mock_write_bytes:
+        template._write_file(text_file, "same\r\n")
+        template._write_bytes(bytes_file, b"same")
+        mock_write_text.assert_not_called()
+        mock_write_bytes.assert_not_called()
+        
+        template._write_file(text_file, "same\n")
+        template._write_bytes(bytes_file, b"other")
+        mock_write_text.assert_called_once_with("same\n")
+        mock_write_bytes.assert_called_once_with(b"other")
+
+def test_write_file_unchanged_crlf(template, temp_dir, monkeypatch):
+    """Test that files written with Windows line endings count as unchanged."""
+    monkeypatch.setattr(os, "linesep", "\r\n")
+    text_file = temp_dir / "test.txt"
+    text_file.write_bytes(b"line one\r\nline two\r\n")
+    
+    with patch('pathlib.Path.write_text') as mock_write_text:
+        template._write_file(text_file, "line one\nline two\n")
+        mock_write_text.assert_not_called()
+        
+        template._write_file(text_file, "line one\nline 2\n")
+        mock_write_text.assert_called_once()
+
 def test_write_file_error(template, temp_dir):
     """Test file writing with error."""
     with patch('pathlib.Path.write_text') as mock_write:
@@ -85,34 +189,73 @@ def test_write_file_error(template, temp_dir):
         with pytest.raises(PermissionError):
             template._write_file(temp_dir / "test.txt", "test")
 
-def test_run_command_success(template):
+def test_run_command_success(template, monkeypatch):
     """Test successful command execution."""
-    with patch('subprocess.run') as mock_run:
-        mock_run.return_value = MagicMock(returncode=0)
-        
-        success = template._run_command(["echo", "test"])
-        assert success
-        mock_run.assert_called_once()
+    mock_run = MagicMock(return_value=COMPLETED)
+    monkeypatch.setattr('subprocess.run', mock_run)
+    
+    success = template._run_command(["echo", "test"])
+    assert success
+    mock_run.assert_called_once()
 
-def test_run_command_failure(template):
+def test_run_command_failure(template, monkeypatch, detached_rmtree):
     """Test command execution failure."""
-    with patch('subprocess.run') as mock_run:
-        mock_run.side_effect = subprocess.CalledProcessError(1, "test")
-        
-        success = template._run_command(["test"])
-        assert not success
+    monkeypatch.setattr('subprocess.run', MagicMock(side_effect=subprocess.CalledProcessError(1, "test")))
+    
+    success = template._run_command(["test"])
+    assert not success
+    assert not template.target_dir.exists()
+    assert [trash.parent for trash in detached_rmtree] == [template.target_dir.parent]
+
+def test_run_command_quiet_by_default(template, capsys, monkeypatch):
+    """Test that command output is hidden and stderr is shown on failure."""
+    def fail(cmd, **kwargs):
+        kwargs['stderr'].write(b"boom")
+        raise subprocess.CalledProcessError(1, cmd)
+    
+    mock_run = MagicMock(side_effect=fail)
+    monkeypatch.setattr('subprocess.run', mock_run)
+    
+    assert not template._run_command(["test"])
+    assert mock_run.call_args[1]['stdout'] == subprocess.DEVNULL
+    assert "boom" in capsys.readouterr().err
 
-def test_run_command_keyboard_interrupt(template):
+def test_run_command_stderr_tail(template, capsys, monkeypatch):
+    """Test that only the end of a long stderr is shown on failure."""
+    def fail(cmd, **kwargs):
+        kwargs['stderr'].write(b"x" * 100_000 + b"last line")
+        raise subprocess.CalledProcessError(1, cmd)
+    
+    monkeypatch.setattr('subprocess.run', fail)
+    assert not template._run_command(["test"])
+    
+    err = capsys.readouterr().err
+    assert err.rstrip().endswith("last line")
+    assert len(err) < 70_000
+
+def test_run_command_verbose(temp_dir, monkeypatch):
+    """Test that verbose templates let command output through."""
+    template = create_mock_template("test_project", [], temp_dir)
+    template.verbose = True
+    mock_run = MagicMock(return_value=COMPLETED)
+    monkeypatch.setattr('subprocess.run', mock_run)
+    
+    assert template._run_command(["echo", "test"])
+    assert mock_run.call_args[1]['stdout'] is None
+
+def test_run_command_keyboard_interrupt(template, monkeypatch):
     """Test command execution with keyboard interrupt."""
-    with patch('subprocess.run') as mock_run, \
-         patch('sys.exit') as mock_exit:
-        mock_run.side_effect = KeyboardInterrupt()
-        
-        template._run_command(["test"])
-        mock_exit.assert_called_once_with(1)
+    mock_exit = MagicMock()
+    monkeypatch.setattr('subprocess.run', MagicMock(side_effect=KeyboardInterrupt()))
+    monkeypatch.setattr('sys.exit', mock_exit)
+    
+    template._run_command(["test"])
+    mock_exit.assert_called_once_with(1)
 
-def test_copy_template_file(template, temp_dir):
+def test_copy_template_file(template, temp_dir, monkeypatch):
     """Test copying a single file."""
+    # Only the contents are checked, so skip copying file metadata
+    monkeypatch.setattr('shutil.copy2', shutil.copyfile)
     src_file = temp_dir / "src.txt"
     src_file.write_text("test")
     
@@ -135,42 +278,56 @@ def test_copy_template_directory(template, temp_dir):
     assert (dest_dir / "test.txt").exists()
     assert (dest_dir / "test.txt").read_text() == "test"
 
-def test_copy_template_error(template, temp_dir):
+def test_copy_template_directory_hardlinks(template, temp_dir):
+    """Test that directory copies hardlink files and fall back to copying."""
+    src_dir = temp_dir / "src"
+    (src_dir / "nested").mkdir(parents=True)
+    (src_dir / "nested" / "test.txt").write_text("test")
+    
+    dest_dir = temp_dir / "dest"
+    template._copy_template(src_dir, dest_dir)
+    assert (dest_dir / "nested" / "test.txt").stat().st_ino == (src_dir / "nested" / "test.txt").stat().st_ino
+    
+    with patch('os.link', side_effect=OSError("Invalid cross-device link")):
+        template._copy_template(src_dir, temp_dir / "copy")
+    assert (temp_dir / "copy" / "nested" / "test.txt").read_text() == "test"
+
+def test_copy_template_error(template, temp_dir, monkeypatch):
     """Test template copying with error."""
     # Create source file
     src_file = temp_dir / "src.txt"
     src_file.write_text("test")
     
-    with patch('shutil.copy2') as mock_copy:
-        mock_copy.side_effect = PermissionError("Permission denied")
-        
-        # Should raise an exception
-        with pytest.raises(PermissionError):
-            template._copy_template(src_file, temp_dir / "dest.txt")
+    monkeypatch.setattr('shutil.copy2', MagicMock(side_effect=PermissionError("Permission denied")))
+    
+    # Should raise an exception
+    with pytest.raises(PermissionError):
+        template._copy_template(src_file, temp_dir / "dest.txt")
 
-def test_open_in_cursor(template):
+def test_open_in_cursor(template, monkeypatch):
     """Test opening project in Cursor."""
-    with patch('subprocess.run') as mock_run:
-        mock_run.return_value = MagicMock(returncode=0)
-        
-        template.open_in_cursor()
-        mock_run.assert_called_once()
+    mock_run = MagicMock(return_value=COMPLETED)
+    monkeypatch.setattr('subprocess.run', mock_run)
+    
+    template.open_in_cursor()
+    mock_run.assert_called_once()
 
-def test_open_in_cursor_error(template):
+def test_open_in_cursor_error(template, monkeypatch):
     """Test opening project in Cursor with error."""
-    with patch('subprocess.run') as mock_run:
-        mock_run.side_effect = Exception("Failed to open")
-        
-        # Should not raise an exception
-        template.open_in_cursor()
+    monkeypatch.setattr('subprocess.run', MagicMock(side_effect=Exception("Failed to open")))
+    
+    # Should not raise an exception
+    template.open_in_cursor()
 
-def test_interrupt_handler(template):
+def test_interrupt_handler(template, fake_signal):
     """Test interrupt handler setup."""
-    with patch('signal.signal') as mock_signal:
-        template._setup_interrupt_handler()
-        mock_signal.assert_called_once_with(signal.SIGINT, mock_signal.call_args[0][1])
+    fake_signal.signal.assert_called_once_with(signal.SIGINT, _handle_interrupt)
+    
+    # A second template reuses the installed handler
+    create_mock_template("other_project", [], template.target_dir)
+    fake_signal.signal.assert_called_once()
 
-def test_interrupt_handler_cleanup(template, temp_dir):
+def test_interrupt_handler_cleanup(template, temp_dir, fake_signal):
     """Test interrupt handler cleanup."""
     with patch('sys.exit') as mock_exit:
         # Create a test file
@@ -178,11 +335,185 @@ def test_interrupt_handler_cleanup(template, temp_dir):
         test_file.write_text("test")
         
         # Get the handler
-        handler = signal.getsignal(signal.SIGINT)
+        handler = fake_signal.getsignal(signal.SIGINT)
         
         # Call the handler
         handler(signal.SIGINT, None)
         
         # Check cleanup and exit
         assert not temp_dir.exists()
-        mock_exit.assert_called_once_with(1) 
\ No newline at end of file
+        mock_exit.assert_called_once_with(1)
+
+def test_interrupt_handler_detached(template, temp_dir, fake_signal):
+    """Test that a detached template is not cleaned up on interrupt."""
+    template.detach_interrupt_handler()
+    with patch('sys.exit') as mock_exit:
+        handler = fake_signal.getsignal(signal.SIGINT)
+        handler(signal.SIGINT, None)
+        
+        assert temp_dir.exists()
+        mock_exit.assert_called_once_with(1)
+
+def test_create_directory_skips_known_dirs(template, temp_dir):
+    """Test that directories already created by the template are not re-created."""
+    test_dir = temp_dir / "test_dir"
+    template._create_directory(test_dir)
+    
+    with patch('pathlib.Path.mkdir') as mock_mkdir:
+        template._create_directory(test_dir)
+        mock_mkdir.assert_not_called()
+
+def test_write_bytes(template, temp_dir):
+    """Test writing pre-encoded content."""
+    test_file = temp_dir / "test.txt"
+    template._write_bytes(test_file, b"test content")
+    
+    assert test_file.read_bytes() == b"test content"
+
+def test_flush_files(template, temp_dir):
+    """Test that queued files are written on flush, last write winning."""
+    template._queue_file(temp_dir / "a.txt", "first")
+    template._queue_file(temp_dir / "b.txt", "b content")
+    template._queue_file(temp_dir / "a.txt", "second")
+    assert not (temp_dir / "a.txt").exists()
+    
+    template._flush_files()
+    
+    assert (temp_dir / "a.txt").read_text() == "second"
+    assert (temp_dir / "b.txt").read_text() == "b content"
+    assert template._pending_writes == {}
+
+def test_flush_files_error(template, temp_dir):
+    """Test that a failed queued write is raised from the flush."""
+    template._queue_file(temp_dir / "a.txt", "a")
+    template._queue_file(temp_dir / "b.txt", "b")
+    
+    with patch('pathlib.Path.write_text') as mock_write:
+        mock_write.side_effect = PermissionError("Permission denied")
+        with pytest.raises(PermissionError):
+            template._flush_files()
+
+def test_feature_set(temp_dir):
+    """Test that selected features are also available as a set."""
+    template = create_mock_template("test_project", ["Docker", "JWT", "Docker"], temp_dir)
+    
+    assert template.features == ["Docker", "JWT", "Docker"]
+    assert template._features == frozenset({"Docker", "JWT"})
+
+def test_flush_files_bytes(template, temp_dir):
+    """Test that queued bytes are written without re-encoding."""
+    template._queue_file(temp_dir / "a.txt", b"bytes content")
+    template._queue_file(temp_dir / "b.txt", "text content")
+    
+    with patch('pathlib.Path.write_text') as mock_write:
+        template._flush_files()
+        mock_write.assert_called_once_with("text content")
+    
+    assert (temp_dir / "a.txt").read_bytes() == b"bytes content"
+
+def test_run_command_resolves_executable_once(template, temp_dir):
+    """Test that executables are looked up once when resolution is enabled."""
+    from src.templates import base
+    base._which.cache_clear()
+    with patch('src.templates.base._RESOLVE_EXECUTABLES', True), \
+         patch('shutil.which', return_value="/usr/bin/tool") as mock_which, \
+         patch('subprocess.run') as mock_run:
+        mock_run.return_value = COMPLETED
+        
+        assert template._run_command(["tool", "first"])
+        assert template._run_command(["tool", "second"])
+        
+        mock_which.assert_called_once_with("tool")
+        assert mock_run.call_args_list[1][0][0] == ["/usr/bin/tool", "second"]
+    base._which.cache_clear()
+
+def test_create_directories_leaves_only(template, temp_dir):
+    """Test that only directories not implied by another path are created."""
+    paths = [temp_dir / "src", temp_dir / "src" / "lib", temp_dir / "tests"]
+    
+    with patch('pathlib.Path.mkdir') as mock_mkdir:
+        template._create_directories(*paths)
+        assert mock_mkdir.call_count == 2
+        
+        # Ancestors of created directories are known as well
+        template._create_directory(temp_dir / "src")
+        assert mock_mkdir.call_count == 2
+
+def test_npm_install_command(template, temp_dir):
+    """Test that npm commands skip resolution when a lockfile exists."""
+    assert template._npm_install_command() == ["npm", "install"]
+    assert template._npm_install_command("left-pad", dev=True) == ["npm", "install", "-D", "left-pad"]
+    
+    (temp_dir / "package-lock.json").write_text("{}")
+    assert template._npm_install_command() == ["npm", "ci"]
+    assert template._npm_install_command("left-pad") == [
+        "npm", "install", "--prefer-offline", "left-pad"
+    ]
+
+def test_run_command_disables_npm_audit(template, temp_dir):
+    """Test that commands run with npm's audit and funding checks disabled."""
+    with patch('subprocess.run') as mock_run:
+        mock_run.return_value = COMPLETED
+        assert template._run_command(["npm", "install"])
+        
+        env = mock_run.call_args[1]['env']
+        assert env["npm_config_audit"] == "false"
+        assert env["npm_config_fund"] == "false"
+        assert env["npm_config_yes"] == "true"
+        assert env["PATH"] == os.environ["PATH"]
+
+def test_run_installs_reuses_node_modules(temp_dir):
+    """Test that identical installs reuse the cached node_modules."""
+    def npm_install(cmd, cwd, **kwargs):
+        if cmd[1] != "install":
+            return COMPLETED
+        package_dir = cwd / "node_modules" / "pkg"
+        package_dir.mkdir(parents=True)
+        (package_dir / "index.js").write_text("module.exports = 1")
+        (cwd / "node_modules" / ".bin").mkdir()
+        (cwd / "node_modules" / ".bin" / "pkg").symlink_to("../pkg/index.js")
+        return COMPLETED
+    
+    templates = []
+    for name in ("first", "second"):
+        (temp_dir / name).mkdir()
+        (temp_dir / name / "package.json").write_text(f'{{"name": "{name}"}}')
+        templates.append(create_mock_template(name, [], temp_dir / name))
+    
+    with patch('subprocess.run', side_effect=npm_install) as mock_run:
+        assert templates[0]._run_installs(["npm", "install", "pkg"])
+        assert templates[1]._run_installs(["npm", "install", "pkg"])
+        
+        commands = [args[0] for args, _ in mock_run.call_args_list]
+        assert commands == [["npm", "install", "pkg"], ["npm", "rebuild"]]
+    
+    node_modules = temp_dir / "second" / "node_modules"
+    assert (node_modules / ".bin" / "pkg").is_symlink()
+    # Projects get their own copies, so editing one leaves the others alone
+    first_index = temp_dir / "first" / "node_modules" / "pkg" / "index.js"
+    assert not os.path.samefile(node_modules / "pkg" / "index.js", first_index)
+    (node_modules / "pkg" / "index.js").write_text("module.exports = 2")
+    assert first_index.read_text() == "module.exports = 1"
+    assert '"name": "second"' in (temp_dir / "second" / "package.json").read_text()
+
+def test_save_modules_prunes_stale_entries(template, temp_dir, flow_dir):
+    """Test that cached node_modules unused for longer than the TTL are deleted."""
+    cache = flow_dir / "node_modules"
+    stale, recent = cache / "stale", cache / "recent"
+    for entry in (stale, recent):
+        (entry / "node_modules").mkdir(parents=True)
+    expired = time.time() - _MODULES_TTL - 60
+    os.utime(stale, (expired, expired))
+    
+    (temp_dir / "node_modules" / "pkg").mkdir(parents=True)
+    template._save_modules(cache / "new")
+    
+    assert sorted(path.name for path in cache.iterdir()) == ["new", "recent"]
+
+def test_run_installs_without_manifest(template):
+    """Test that installs run uncached when there is no package.json."""
+    with patch('subprocess.run') as mock_run:
+        mock_run.return_value = COMPLETED
+        
+        assert template._run_installs(["npm", "install", "a"], ["npm", "install", "-D", "b"])
+        assert mock_run.call_count == 2
@@ -1,8 +1,16 @@
 """Tests for configuration management."""
 import pytest
 from pathlib import Path
+from src import config as config_module
 from src.config import Config, ConfigManager
 
+@pytest.fixture
+def config_manager(temp_dir, monkeypatch):
+    """Create a config manager rooted in a temporary directory."""
+    monkeypatch.setattr(config_module, "_CONFIG_DIR", temp_dir / ".flow")
+    monkeypatch.setattr(config_module, "_CONFIG_FILE", temp_dir / ".flow" / "config.json")
+    return ConfigManager()
+
 def test_config_default_values():
     """Test default configuration values."""
     config = Config()
@@ -15,12 +23,9 @@ def test_config_custom_values():
     assert config.dev_folder == "/custom/path"
     assert config.ide == "vscode"
 
-def test_config_manager_save_load(temp_dir, monkeypatch):
+def test_config_manager_save_load(config_manager):
     """Test saving and loading configuration."""
-    # Mock home directory
-    monkeypatch.setattr(Path, "home", lambda: temp_dir)
-    
-    manager = ConfigManager()
+    manager = config_manager
     config = Config(dev_folder="/test/path", ide="vscode")
     
     # Test save
@@ -32,14 +37,54 @@ def test_config_manager_save_load(temp_dir, monkeypatch):
     assert loaded_config.dev_folder == "/test/path"
     assert loaded_config.ide == "vscode"
 
-def test_config_manager_update(temp_dir, monkeypatch):
+def test_config_manager_update(config_manager):
     """Test updating configuration values."""
-    # Mock home directory
-    monkeypatch.setattr(Path, "home", lambda: temp_dir)
-    
-    manager = ConfigManager()
+    manager = config_manager
     manager.update_config(dev_folder="/new/path")
     
     config = manager.load_config()
     assert config.dev_folder == "/new/path"
-    assert config.ide == "cursor"  # Default value should remain 
\ No newline at end of file
+    assert config.ide == "cursor"  # Default value should remain
+
+def test_config_manager_caches_load(config_manager):
+    """Test that configuration is only read from disk once."""
+    manager = config_manager
+    manager._cache = None
+    first = manager.load_config()
+    
+    # Changes on disk are not re-read once cached
+    manager.config_file.write_text('{"dev_folder": "/elsewhere"}')
+    assert manager.load_config() is first
+    
+    # Saving refreshes the cache
+    config = Config(dev_folder="/saved")
+    manager.save_config(config)
+    assert manager.load_config() is config
+
+def test_config_manager_ignores_unknown_keys(config_manager):
+    """Test that unknown keys in the config file are ignored."""
+    manager = config_manager
+    manager.config_file.write_text('{"dev_folder": "/test/path", "theme": "dark"}')
+    manager._cache = None
+    
+    config = manager.load_config()
+    assert config.dev_folder == "/test/path"
+    assert config.ide == "cursor"
+
+def test_config_manager_rejects_wrong_types(config_manager):
+    """Test that values of the wrong type fall back to their defaults."""
+    manager = config_manager
+    manager.config_file.write_text('{"dev_folder": 123, "ide": "vscode"}')
+    manager._cache = None
+    
+    config = manager.load_config()
+    assert config.dev_folder == "~/Development"
+    assert config.ide == "vscode"
+
+def test_config_manager_save_is_atomic(config_manager):
+    """Test that saving replaces the config file without leaving a temp file."""
+    manager = config_manager
+    manager.save_config(Config(dev_folder="/atomic"))
+    
+    assert list(manager.config_dir.iterdir()) == [manager.config_file]
+    assert '"/atomic"' in manager.config_file.read_text()
@@ -2,304 +2,253 @@
 import pytest
 from pathlib import Path
 from unittest.mock import patch, MagicMock, call
+from types import SimpleNamespace
+import os
 import subprocess
 from src.templates import FastAPITemplate
 
+# subprocess.run result for commands that succeed; only returncode is read
+COMPLETED = SimpleNamespace(returncode=0)
+
+# Directories every generated project has
+BASIC_DIRS = frozenset([
+    "src", "tests", "src/api", "src/core", "src/db", "src/models", "src/schemas", "src/services"
+])
+
 @pytest.fixture
 def temp_dir(tmp_path):
     """Create a temporary directory for testing."""
     return tmp_path
 
+def _assert_contains_all(path: Path, snippets):
+    """Assert that a file exists and contains every snippet, reading it once."""
+    assert path.exists(), path
+    data = path.read_bytes()
+    missing = [snippet for snippet in snippets if snippet.encode() not in data]
+    assert not missing, f"{missing} missing from {path}"
+
+def _present(root: Path):
+    """Return every file under root as a relative POSIX path, in a single walk."""
+    return {
+        os.path.relpath(os.path.join(d, f), root).replace(os.sep, "/")
+        for d, _, files in os.walk(root) for f in files
+    }
+
+def _fail_alembic(cmd, *args, **kwargs):
+    """Stand in for subprocess.run, failing only alembic commands."""
+    if cmd[0] == "alembic":
+        raise subprocess.CalledProcessError(1, cmd)
+    return COMPLETED
+
+@pytest.fixture(autouse=True)
+def mock_run(monkeypatch):
+    """Replace subprocess.run for every test, succeeding by default."""
+    mock = MagicMock(return_value=COMPLETED)
+    monkeypatch.setattr("subprocess.run", mock)
+    return mock
+
 @pytest.fixture
 def template(temp_dir):
     """Create a FastAPI template instance."""
     return FastAPITemplate("test_project", [], temp_dir)
 
-def test_basic_generation(template, temp_dir):
+@pytest.fixture(scope="module")
+def generated_project(tmp_path_factory):
+    """Generate each feature combination once for the tests that only read the result."""
+    projects = {}
+    
+    def generate(*features):
+        key = frozenset(features)
+        if key not in projects:
+            target = tmp_path_factory.mktemp("fastapi") / "test_project"
+            with patch('subprocess.run') as mock_run:
+                mock_run.return_value = COMPLETED
+                assert FastAPITemplate("test_project", list(features), target).generate()
+            projects[key] = target
+        return projects[key]
+    
+    return generate
+
+def test_basic_generation(generated_project):
     """Test basic project generation without additional features."""
-    with patch('subprocess.run') as mock_run:
-        mock_run.return_value = MagicMock(returncode=0)
-        
-        success = template.generate()
-        assert success
-        
-        # Check directory structure
-        assert (temp_dir / "src").exists()
-        assert (temp_dir / "tests").exists()
-        assert (temp_dir / "src" / "api").exists()
-        assert (temp_dir / "src" / "core").exists()
-        assert (temp_dir / "src" / "db").exists()
-        assert (temp_dir / "src" / "models").exists()
-        assert (temp_dir / "src" / "schemas").exists()
-        assert (temp_dir / "src" / "services").exists()
-        
-        # Check main.py
-        main_py = temp_dir / "src" / "main.py"
-        assert main_py.exists()
-        content = main_py.read_text()
-        assert "from fastapi import FastAPI" in content
-        assert "app = FastAPI" in content
-        assert "CORSMiddleware" in content
+    project_dir = generated_project()
+    
+    # Check directory structure
+    dirs = {p.relative_to(project_dir).as_posix() for p in project_dir.rglob("*") if p.is_dir()}
+    assert BASIC_DIRS <= dirs, BASIC_DIRS - dirs
+    
+    # Check main.py
+    _assert_contains_all(
+        project_dir / "src" / "main.py",
+        ["from fastapi import FastAPI", "app = FastAPI", "CORSMiddleware"]
+    )
 
-def test_poetry_setup(temp_dir):
+def test_poetry_setup(temp_dir, mock_run):
     """Test project generation with Poetry."""
     template = FastAPITemplate("test_project", ["Poetry"], temp_dir)
     
-    with patch('subprocess.run') as mock_run:
-        mock_run.return_value = MagicMock(returncode=0)
-        
-        success = template.generate()
-        assert success
-        
-        # Verify Poetry commands were called
-        calls = [call[0][0] for call in mock_run.call_args_list]
-        assert ["poetry", "init", "--no-interaction"] in calls
-        assert any("poetry" in cmd and "add" in cmd for cmd in calls)
+    success = template.generate()
+    assert success
+    
+    # Verify Poetry resolves and installs in a single command
+    calls = [call[0][0] for call in mock_run.call_args_list]
+    assert calls == [["poetry", "install", "--no-root", "--no-interaction"]]
+    
+    # Check pyproject.toml
+    _assert_contains_all(
+        temp_dir / "pyproject.toml",
+        ['name = "test_project"', 'fastapi = ">=0.100.0"', "[tool.poetry.group.dev.dependencies]"]
+    )
+
+def test_poetry_lockfile_cache(temp_dir, flow_dir, mock_run):
+    """Test that a resolved poetry.lock is cached and reused for the same dependencies."""
+    first_dir = temp_dir / "first"
+    template = FastAPITemplate("first", ["Poetry"], first_dir)
+    
+    def install(cmd, *args, **kwargs):
+        (first_dir / "poetry.lock").write_text("# resolved")
+        return COMPLETED
+    
+    mock_run.side_effect = install
+    assert template.generate()
+    assert len(list((flow_dir / "lockfiles").iterdir())) == 1
+    
+    second_dir = temp_dir / "second"
+    template = FastAPITemplate("second", ["Poetry"], second_dir)
+    mock_run.side_effect = None
+    assert template.generate()
+    assert (second_dir / "poetry.lock").read_bytes() == b"# resolved"
 
-def test_requirements_setup(template, temp_dir):
+def test_requirements_setup(generated_project):
     """Test requirements.txt generation."""
-    with patch('subprocess.run') as mock_run:
-        mock_run.return_value = MagicMock(returncode=0)
-        
-        success = template.generate()
-        assert success
-        
-        # Check requirements files
-        requirements_txt = temp_dir / "requirements.txt"
-        requirements_dev_txt = temp_dir / "requirements-dev.txt"
-        
-        assert requirements_txt.exists()
-        assert requirements_dev_txt.exists()
-        
-        # Check content
-        content = requirements_txt.read_text()
-        assert "fastapi" in content
-        assert "uvicorn" in content
-        assert "pydantic" in content
-        
-        dev_content = requirements_dev_txt.read_text()
-        assert "pytest" in dev_content
-        assert "black" in dev_content
-        assert "flake8" in dev_content
-
-def test_sqlalchemy_setup(temp_dir):
-    """Test project generation with SQLAlchemy."""
-    template = FastAPITemplate("test_project", ["SQLAlchemy"], temp_dir)
+    project_dir = generated_project()
     
-    with patch('subprocess.run') as mock_run:
-        mock_run.return_value = MagicMock(returncode=0)
-        
-        success = template.generate()
-        assert success
-        
-        # Check database setup
-        db_file = temp_dir / "src" / "db" / "database.py"
-        assert db_file.exists()
-        content = db_file.read_text()
-        assert "from sqlalchemy.ext.asyncio import create_async_engine" in content
-        assert "class Base(DeclarativeBase):" in content
-        
-        # Check model setup
-        model_file = temp_dir / "src" / "models" / "user.py"
-        assert model_file.exists()
-        content = model_file.read_text()
-        assert "class User(Base):" in content
-        assert "email: Mapped[str]" in content
-        assert "hashed_password: Mapped[str]" in content
+    # Check requirements files
+    requirements_txt = project_dir / "requirements.txt"
+    requirements_dev_txt = project_dir / "requirements-dev.txt"
+    
+    assert requirements_txt.exists()
+    assert requirements_dev_txt.exists()
+    
+    # Check content
+    _assert_contains_all(requirements_txt, ["fastapi", "uvicorn", "pydantic"])
+    _assert_contains_all(requirements_dev_txt, ["pytest", "black", "flake8"])
 
-def test_alembic_setup(temp_dir):
+def test_alembic_setup(temp_dir, mock_run):
     """Test project generation with Alembic."""
     template = FastAPITemplate("test_project", ["SQLAlchemy", "Alembic"], temp_dir)
     
-    with patch('subprocess.run') as mock_run:
-        mock_run.return_value = MagicMock(returncode=0)
-        
-        success = template.generate()
-        assert success
-        
-        # Verify Alembic initialization
-        assert mock_run.call_args_list[0][0][0] == ["alembic", "init", "migrations"]
-        
-        # Check alembic.ini
-        alembic_ini = temp_dir / "alembic.ini"
-        assert alembic_ini.exists()
-        content = alembic_ini.read_text()
-        assert "[alembic]" in content
-        assert "sqlalchemy.url" in content
-        assert "script_location = migrations" in content
-
-def test_jwt_setup(temp_dir):
-    """Test project generation with JWT authentication."""
-    template = FastAPITemplate("test_project", ["JWT"], temp_dir)
-    
-    with patch('subprocess.run') as mock_run:
-        mock_run.return_value = MagicMock(returncode=0)
-        
-        success = template.generate()
-        assert success
-        
-        # Check auth setup
-        auth_file = temp_dir / "src" / "core" / "auth.py"
-        assert auth_file.exists()
-        content = auth_file.read_text()
-        assert "from jose import JWTError, jwt" in content
-        assert "from passlib.context import CryptContext" in content
-        assert "def create_access_token" in content
-        assert "def verify_password" in content
-        
-        # Check requirements
-        requirements_txt = temp_dir / "requirements.txt"
-        content = requirements_txt.read_text()
-        assert "python-jose" in content
-        assert "passlib" in content
-
-def test_docker_setup(temp_dir):
-    """Test project generation with Docker."""
-    template = FastAPITemplate("test_project", ["Docker"], temp_dir)
+    success = template.generate()
+    assert success
     
-    with patch('subprocess.run') as mock_run:
-        mock_run.return_value = MagicMock(returncode=0)
-        
-        success = template.generate()
-        assert success
-        
-        # Check Docker files
-        dockerfile = temp_dir / "Dockerfile"
-        compose_file = temp_dir / "docker-compose.yml"
-        
-        assert dockerfile.exists()
-        assert compose_file.exists()
-        
-        # Check Dockerfile content
-        dockerfile_content = dockerfile.read_text()
-        assert "FROM python:3.11-slim" in dockerfile_content
-        assert "WORKDIR /app" in dockerfile_content
-        assert "RUN pip install" in dockerfile_content
-        
-        # Check docker-compose.yml content
-        compose_content = compose_file.read_text()
-        assert "version: '3.8'" in compose_content
-        assert "services:" in compose_content
-        assert "web:" in compose_content
-        assert "db:" in compose_content
-        assert "postgres:" in compose_content
-
-def test_prometheus_setup(temp_dir):
-    """Test project generation with Prometheus metrics."""
-    template = FastAPITemplate("test_project", ["Prometheus"], temp_dir)
+    # Verify Alembic initialization
+    assert mock_run.call_args_list[0][0][0] == ["alembic", "init", "migrations"]
     
-    with patch('subprocess.run') as mock_run:
-        mock_run.return_value = MagicMock(returncode=0)
-        
-        success = template.generate()
-        assert success
-        
-        # Check metrics setup
-        metrics_file = temp_dir / "src" / "core" / "metrics.py"
-        assert metrics_file.exists()
-        content = metrics_file.read_text()
-        assert "from prometheus_fastapi_instrumentator import Instrumentator" in content
-        assert "def setup_metrics" in content
-        
-        # Check requirements
-        requirements_txt = temp_dir / "requirements.txt"
-        content = requirements_txt.read_text()
-        assert "prometheus-fastapi-instrumentator" in content
-
-def test_api_docs_setup(temp_dir):
-    """Test project generation with API documentation."""
-    template = FastAPITemplate("test_project", ["API-Docs"], temp_dir)
+    # Check alembic.ini
+    _assert_contains_all(
+        temp_dir / "alembic.ini",
+        ["[alembic]", "sqlalchemy.url", "script_location = migrations"]
+    )
+
+@pytest.mark.parametrize("features,expected_contents", [
+    (["SQLAlchemy"], {
+        "src/db/database.py": [
+            "from sqlalchemy.ext.asyncio import create_async_engine",
+            "class Base(DeclarativeBase):",
+        ],
+        "src/models/user.py": [
+            "class User(Base):",
+            "email: Mapped[str]",
+            "hashed_password: Mapped[str]",
+        ],
+    }),
+    (["JWT"], {
+        "src/core/auth.py": [
+            "from jose import JWTError, jwt",
+            "from passlib.context import CryptContext",
+            "def create_access_token",
+            "def verify_password",
+        ],
+        "requirements.txt": ["python-jose", "passlib"],
+    }),
+    (["Docker"], {
+        "Dockerfile": ["FROM python:3.11-slim", "WORKDIR /app", "RUN pip install"],
+        "docker-compose.yml": ["version: '3.8'", "services:", "web:", "db:", "postgres:"],
+    }),
+    (["Prometheus"], {
+        "src/core/metrics.py": [
+            "from prometheus_fastapi_instrumentator import Instrumentator",
+            "def setup_metrics",
+        ],
+        "requirements.txt": ["prometheus-fastapi-instrumentator"],
+    }),
+    (["API-Docs"], {
+        "src/main.py": [
+            "from fastapi.openapi.utils import get_openapi",
+            "def custom_openapi",
+            "app.openapi = custom_openapi",
+        ],
+    }),
+], ids=["sqlalchemy", "jwt", "docker", "prometheus", "api-docs"])
+def test_feature_generation(generated_project, features, expected_contents):
+    """Test that each feature writes its files with the expected content."""
+    project_dir = generated_project(*features)
     
-    with patch('subprocess.run') as mock_run:
-        mock_run.return_value = MagicMock(returncode=0)
-        
-        success = template.generate()
-        assert success
-        
-        # Check main.py for OpenAPI configuration
-        main_py = temp_dir / "src" / "main.py"
-        content = main_py.read_text()
-        assert "from fastapi.openapi.utils import get_openapi" in content
-        assert "def custom_openapi" in content
-        assert "app.openapi = custom_openapi" in content
-
-def test_command_failure(template, temp_dir):
-    """Test handling of command failures."""
-    with patch.object(template, '_setup_requirements', return_value=False) as mock_setup:
+    for path, snippets in expected_contents.items():
+        _assert_contains_all(project_dir / path, snippets)
+
+@pytest.mark.parametrize("effect", [
+    {"return_value": False},
+    {"side_effect": Exception("Setup failed")},
+], ids=["step-failure", "exception"])
+def test_failure_cleanup(template, temp_dir, effect):
+    """Test that a failed or raising setup step cleans up the directory."""
+    with patch.object(template, '_setup_requirements', **effect):
         success = template.generate()
         assert not success
         
         # Check that the directory was cleaned up
         assert not temp_dir.exists()
 
-def test_cleanup_on_exception(template, temp_dir):
-    """Test cleanup when an exception occurs."""
-    with patch.object(template, '_setup_requirements') as mock_setup:
-        mock_setup.side_effect = Exception("Setup failed")
-        
-        success = template.generate()
-        assert not success
-        
-        # Check that the directory was cleaned up
-        assert not temp_dir.exists()
-
-def test_poetry_command_failure(temp_dir):
+def test_poetry_command_failure(temp_dir, mock_run):
     """Test handling of Poetry command failures."""
     template = FastAPITemplate("test_project", ["Poetry"], temp_dir)
+    mock_run.side_effect = subprocess.CalledProcessError(1, "poetry install")
     
-    with patch('subprocess.run') as mock_run:
-        mock_run.side_effect = subprocess.CalledProcessError(1, "poetry init")
-        
-        success = template.generate()
-        assert not success
-        assert not temp_dir.exists()
+    success = template.generate()
+    assert not success
+    assert not temp_dir.exists()
 
-def test_alembic_command_failure(temp_dir):
+def test_alembic_command_failure(temp_dir, mock_run):
     """Test handling of Alembic command failures."""
     template = FastAPITemplate("test_project", ["SQLAlchemy", "Alembic"], temp_dir)
     
-    with patch('subprocess.run') as mock_run:
-        # Make alembic init fail
-        def mock_run_with_failure(cmd, *args, **kwargs):
-            if cmd[0] == "alembic":
-                raise subprocess.CalledProcessError(1, cmd)
-            return MagicMock(returncode=0)
-        
-        mock_run.side_effect = mock_run_with_failure
-        
-        success = template.generate()
-        assert not success
-        assert not temp_dir.exists()
+    mock_run.side_effect = _fail_alembic
+    
+    success = template.generate()
+    assert not success
+    assert not temp_dir.exists()
 
 def test_file_write_error(template, temp_dir):
     """Test handling of file write errors."""
-    with patch('pathlib.Path.write_text') as mock_write:
+    with patch('pathlib.Path.write_bytes') as mock_write:
         mock_write.side_effect = PermissionError("Permission denied")
         
         success = template.generate()
         assert not success
         assert not temp_dir.exists()
 
-def test_multiple_features(temp_dir):
+def test_multiple_features(generated_project):
     """Test project generation with multiple features."""
-    features = ["SQLAlchemy", "JWT", "Docker", "Prometheus", "API-Docs"]
-    template = FastAPITemplate("test_project", features, temp_dir)
+    project_dir = generated_project("SQLAlchemy", "JWT", "Docker", "Prometheus", "API-Docs")
     
-    with patch('subprocess.run') as mock_run:
-        mock_run.return_value = MagicMock(returncode=0)
-        
-        success = template.generate()
-        assert success
-        
-        # Check that all feature files exist
-        assert (temp_dir / "src" / "db" / "database.py").exists()
-        assert (temp_dir / "src" / "core" / "auth.py").exists()
-        assert (temp_dir / "Dockerfile").exists()
-        assert (temp_dir / "src" / "core" / "metrics.py").exists()
-        
-        # Check requirements
-        requirements_txt = temp_dir / "requirements.txt"
-        content = requirements_txt.read_text()
-        assert "sqlalchemy" in content
-        assert "python-jose" in content
-        assert "prometheus-fastapi-instrumentator" in content 
\ No newline at end of file
+    # Check that all feature files exist
+    expected = {"src/db/database.py", "src/core/auth.py", "Dockerfile", "src/core/metrics.py"}
+    files = _present(project_dir)
+    assert expected <= files, expected - files
+    
+    # Check requirements
+    _assert_contains_all(
+        project_dir / "requirements.txt",
+        ["sqlalchemy", "python-jose", "prometheus-fastapi-instrumentator"]
+    ) 
\ No newline at end of file
@@ -1,17 +1,20 @@
 """Tests for main.py."""
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import MagicMock
 from pathlib import Path
 import signal
+import subprocess
+import sys
+import typer
 from typer.testing import CliRunner
-import questionary
-import shutil
+from types import SimpleNamespace
 from unittest.mock import call
 
 from src.main import (
     get_template_class,
     setup_interrupt_handler,
     app,
+    new_project,
     ReactTemplate,
     NextjsTemplate,
     ReactSupabaseTemplate,
@@ -24,205 +27,189 @@ from src.main import (
 
 runner = CliRunner()
 
+def _new_project_exit_code():
+    """Run the new-project command as a plain call, skipping Typer's argv parsing."""
+    try:
+        new_project(verbose=False, refresh_cache=False)
+    except typer.Exit as e:
+        return e.exit_code
+    return 0
+
+@pytest.fixture(autouse=True)
+def clear_template_cache():
+    """Drop memoized template classes so patched classes are picked up."""
+    get_template_class.cache_clear()
+    yield
+    get_template_class.cache_clear()
+
+@pytest.fixture
+def mocked_main(mocker):
+    """Patch the CLI's UI, config and directory removal."""
+    return SimpleNamespace(
+        ui=mocker.patch('src.main.ui'),
+        config=mocker.patch('src.main.config'),
+        rmtree=mocker.patch('shutil.rmtree')
+    )
+
+# Template class expected for each (project type, framework) selection
+EXPECTED_TEMPLATE_CLASSES = {
+    ("React Frontend", None): ReactTemplate,
+    ("React Frontend", "next"): NextjsTemplate,
+    ("React + Supabase", None): ReactSupabaseTemplate,
+    ("T3 Stack", None): T3Template,
+    ("FastAPI Backend", None): FastAPITemplate,
+    ("Python Project", None): PythonTemplate,
+    ("Vue Frontend", None): VueTemplate,
+    ("Django Full-stack", None): DjangoTemplate,
+    # Unknown types have no template
+    ("Unknown", None): None,
+}
+
 def test_get_template_class():
     """Test template class selection."""
-    # Test React templates
-    assert get_template_class("React Frontend") == ReactTemplate
-    assert get_template_class("React Frontend", "next") == NextjsTemplate
-    
-    # Test other templates
-    assert get_template_class("React + Supabase") == ReactSupabaseTemplate
-    assert get_template_class("T3 Stack") == T3Template
-    assert get_template_class("FastAPI Backend") == FastAPITemplate
-    assert get_template_class("Python Project") == PythonTemplate
-    assert get_template_class("Vue Frontend") == VueTemplate
-    assert get_template_class("Django Full-stack") == DjangoTemplate
-    
-    # Test unknown type
-    assert get_template_class("Unknown") is None
+    actual = {key: get_template_class(*key) for key in EXPECTED_TEMPLATE_CLASSES}
+    assert actual == EXPECTED_TEMPLATE_CLASSES
 
-def test_setup_interrupt_handler():
+def test_setup_interrupt_handler(monkeypatch):
     """Test interrupt handler setup."""
-    with patch('signal.signal') as mock_signal:
-        setup_interrupt_handler()
-        mock_signal.assert_called_once_with(signal.SIGINT, mock_signal.call_args[0][1])
+    installed = []
+    monkeypatch.setattr(signal, "signal", lambda signum, handler: installed.append(signum))
+    setup_interrupt_handler()
+    assert installed == [signal.SIGINT]
+
+# Prompt answers for a complete Python project run
+_UI_ANSWERS = {
+    "get_project_name": "test_project",
+    "select_category": "web",
+    "select_project_type": "Python Project",
+    "select_features": [],
+    "confirm": True,
+}
 
-@patch('src.main.ui')
-@patch('src.main.config')
-@patch('shutil.rmtree')
-@patch('src.main.PythonTemplate')
-def test_new_project_success(mock_template_class, mock_rmtree, mock_config, mock_ui):
-    """Test successful project creation."""
+# Each scenario overrides some prompt answers and sets what generate() returns,
+# or None when the run should stop before a template is created
+NEW_PROJECT_SCENARIOS = [
+    pytest.param({}, True, 0, [], id="success"),
+    pytest.param({}, False, 1, ["Failed to create project"], id="failure"),
+    pytest.param({"get_project_name": None}, None, 1, ["Project name is required"], id="missing_name"),
+    pytest.param({"select_category": None}, None, 1, ["Project category is required"], id="missing_category"),
+    pytest.param({"select_project_type": None}, None, 1, ["Project type is required"], id="missing_type"),
+]
+
+@pytest.mark.parametrize("answers,generated,exit_code,errors", NEW_PROJECT_SCENARIOS)
+def test_new_project(mocked_main, mocker, monkeypatch, answers, generated, exit_code, errors):
+    """Test project creation outcomes for each prompt scenario."""
+    mock_template_class = mocker.patch('src.templates.python.PythonTemplate')
+    
     # Mock UI responses
-    mock_ui.get_project_name.return_value = "test_project"
-    mock_ui.select_category.return_value = "web"
-    mock_ui.select_project_type.return_value = "Python Project"
-    mock_ui.select_features.return_value = []
-    mock_ui.confirm.return_value = True
+    for prompt, value in {**_UI_ANSWERS, **answers}.items():
+        getattr(mocked_main.ui, prompt).return_value = value
     
     # Mock config
-    mock_config.load_config.return_value = MagicMock(
+    mocked_main.config.load_config.return_value = MagicMock(
         dev_folder="~/test",
         ide="cursor"
     )
     
     # Mock template
-    mock_template_instance = MagicMock()
-    mock_template_instance.generate.return_value = True
-    mock_template_class.return_value = mock_template_instance
+    mock_template_class.return_value.generate.return_value = generated
     
     # Mock Path.exists
-    with patch('pathlib.Path.exists', return_value=False):
-        result = runner.invoke(app, ["new", "project"])
-        assert result.exit_code == 0
-        
-        # Verify template was created with correct parameters
-        mock_template_class.assert_called_once()
-        mock_template_instance.generate.assert_called_once()
-        mock_ui.print_success.assert_called_once()
+    monkeypatch.setattr(Path, "exists", lambda self: False)
+    assert _new_project_exit_code() == exit_code
+    
+    assert mock_template_class.call_count == (generated is not None)
+    if errors:
+        assert mocked_main.ui.print_error.call_args_list == [*map(call, errors)]
+    else:
+        mock_template_class.return_value.generate.assert_called_once()
+        mocked_main.ui.print_success.assert_called_once()
 
-@patch('src.main.ui')
-@patch('src.main.config')
-@patch('shutil.rmtree')
-@patch('src.main.PythonTemplate')
-def test_new_project_failure(mock_template_class, mock_rmtree, mock_config, mock_ui):
-    """Test project creation failure."""
+def test_new_project_existing_directory(mocked_main, monkeypatch):
+    """Test project creation with existing directory."""
     # Mock UI responses
-    mock_ui.get_project_name.return_value = "test_project"
-    mock_ui.select_category.return_value = "web"
-    mock_ui.select_project_type.return_value = "Python Project"
-    mock_ui.select_features.return_value = []
-    mock_ui.confirm.return_value = True
+    mocked_main.ui.get_project_name.return_value = "test_project"
+    mocked_main.ui.select_category.return_value = "web"
+    mocked_main.ui.select_project_type.return_value = "Python Project"
+    mocked_main.ui.select_features.return_value = []
+    mocked_main.ui.confirm.return_value = False
     
     # Mock config
-    mock_config.load_config.return_value = MagicMock(
+    mocked_main.config.load_config.return_value = MagicMock(
         dev_folder="~/test",
         ide="cursor"
     )
     
-    # Mock template
-    mock_template_instance = MagicMock()
-    mock_template_instance.generate.return_value = False
-    mock_template_class.return_value = mock_template_instance
-    
     # Mock Path.exists
-    with patch('pathlib.Path.exists', return_value=False):
-        result = runner.invoke(app, ["new", "project"])
-        assert result.exit_code == 1
-        
-        # Verify template was created and generate was called
-        mock_template_class.assert_called_once()
-        mock_template_instance.generate.assert_called_once()
-        assert mock_ui.print_error.call_count == 2
-        mock_ui.print_error.assert_has_calls([
-            call('Failed to create project'),
-            call('An error occurred: 1')
-        ])
-
-@patch('src.main.ui')
-def test_new_project_missing_name(mock_ui):
-    """Test project creation with missing name."""
-    # Mock UI responses
-    mock_ui.get_project_name.return_value = None
-    
-    result = runner.invoke(app, ["new", "project"])
-    assert result.exit_code == 1
-    assert mock_ui.print_error.call_count == 2
-    mock_ui.print_error.assert_has_calls([
-        call('Project name is required'),
-        call('An error occurred: 1')
-    ])
-
-@patch('src.main.ui')
-def test_new_project_missing_category(mock_ui):
-    """Test project creation with missing category."""
-    # Mock UI responses
-    mock_ui.get_project_name.return_value = "test_project"
-    mock_ui.select_category.return_value = None
-    
-    result = runner.invoke(app, ["new", "project"])
-    assert result.exit_code == 1
-    assert mock_ui.print_error.call_count == 2
-    mock_ui.print_error.assert_has_calls([
-        call('Project category is required'),
-        call('An error occurred: 1')
-    ])
+    monkeypatch.setattr(Path, "exists", lambda self: True)
+    assert _new_project_exit_code() == 1
+    mocked_main.ui.print_error.assert_called_once_with('Project creation cancelled.')
 
-@patch('src.main.ui')
-def test_new_project_missing_type(mock_ui):
-    """Test project creation with missing project type."""
-    # Mock UI responses
-    mock_ui.get_project_name.return_value = "test_project"
-    mock_ui.select_category.return_value = "web"
-    mock_ui.select_project_type.return_value = None
+def test_new_project_react_framework(mocked_main, mocker, monkeypatch):
+    """Test React project creation with framework selection."""
+    mock_template_class = mocker.patch('src.templates.nextjs.NextjsTemplate')
     
-    result = runner.invoke(app, ["new", "project"])
-    assert result.exit_code == 1
-    assert mock_ui.print_error.call_count == 2
-    mock_ui.print_error.assert_has_calls([
-        call('Project type is required'),
-        call('An error occurred: 1')
-    ])
-
-@patch('src.main.ui')
-@patch('src.main.config')
-@patch('shutil.rmtree')
-def test_new_project_existing_directory(mock_rmtree, mock_config, mock_ui):
-    """Test project creation with existing directory."""
     # Mock UI responses
-    mock_ui.get_project_name.return_value = "test_project"
-    mock_ui.select_category.return_value = "web"
-    mock_ui.select_project_type.return_value = "Python Project"
-    mock_ui.select_features.return_value = []
-    mock_ui.confirm.return_value = False
+    mocked_main.ui.get_project_name.return_value = "test_project"
+    mocked_main.ui.select_category.return_value = "web"
+    mocked_main.ui.select_project_type.return_value = "React Frontend"
+    mocked_main.ui.select_react_framework.return_value = "next"
+    mocked_main.ui.select_features.return_value = []
+    mocked_main.ui.confirm.return_value = True
     
     # Mock config
-    mock_config.load_config.return_value = MagicMock(
+    mocked_main.config.load_config.return_value = MagicMock(
         dev_folder="~/test",
         ide="cursor"
     )
     
+    # Mock template
+    mock_template_instance = MagicMock()
+    mock_template_instance.generate.return_value = True
+    mock_template_class.return_value = mock_template_instance
+    
     # Mock Path.exists
-    with patch('pathlib.Path.exists', return_value=True):
-        result = runner.invoke(app, ["new", "project"])
-        assert result.exit_code == 1
-        assert mock_ui.print_error.call_count == 2
-        mock_ui.print_error.assert_has_calls([
-            call('Project creation cancelled.'),
-            call('An error occurred: 1')
-        ])
+    monkeypatch.setattr(Path, "exists", lambda self: False)
+    result = runner.invoke(app, ["new", "project"])
+    assert result.exit_code == 0
+    
+    # Verify NextjsTemplate was used
+    mock_template_class.assert_called_once()
+    mock_template_instance.generate.assert_called_once()
+    mocked_main.ui.print_success.assert_called_once()
 
-@patch('src.main.ui')
-@patch('src.main.config')
-@patch('shutil.rmtree')
-@patch('src.main.NextjsTemplate')
-def test_new_project_react_framework(mock_template_class, mock_rmtree, mock_config, mock_ui):
-    """Test React project creation with framework selection."""
+def test_main_defers_heavy_imports():
+    """Test that importing the CLI module does not load UI or template dependencies."""
+    code = (
+        "import sys, src.main; "
+        "assert 'questionary' not in sys.modules; "
+        "assert 'src.ui' not in sys.modules; "
+        "assert 'src.templates.django' not in sys.modules"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=Path(__file__).parent.parent)
+    assert result.returncode == 0
+
+def test_new_project_empty_existing_directory(mocked_main, mocker, tmp_path):
+    """Test that an empty existing directory is reused without confirmation."""
+    mock_template_class = mocker.patch('src.templates.python.PythonTemplate')
+    (tmp_path / "test_project").mkdir()
+    
     # Mock UI responses
-    mock_ui.get_project_name.return_value = "test_project"
-    mock_ui.select_category.return_value = "web"
-    mock_ui.select_project_type.return_value = "React Frontend"
-    mock_ui.select_react_framework.return_value = "next"
-    mock_ui.select_features.return_value = []
-    mock_ui.confirm.return_value = True
+    mocked_main.ui.get_project_name.return_value = "test_project"
+    mocked_main.ui.select_category.return_value = "web"
+    mocked_main.ui.select_project_type.return_value = "Python Project"
+    mocked_main.ui.select_features.return_value = []
     
     # Mock config
-    mock_config.load_config.return_value = MagicMock(
-        dev_folder="~/test",
-        ide="cursor"
+    mocked_main.config.load_config.return_value = MagicMock(
+        dev_folder=str(tmp_path),
+        ide="vscode"
     )
     
     # Mock template
-    mock_template_instance = MagicMock()
-    mock_template_instance.generate.return_value = True
-    mock_template_class.return_value = mock_template_instance
+    mock_template_class.return_value.generate.return_value = True
     
-    # Mock Path.exists
-    with patch('pathlib.Path.exists', return_value=False):
-        result = runner.invoke(app, ["new", "project"])
-        assert result.exit_code == 0
-        
-        # Verify NextjsTemplate was used
-        mock_template_class.assert_called_once()
-        mock_template_instance.generate.assert_called_once()
-        mock_ui.print_success.assert_called_once() 
\ No newline at end of file
+    result = runner.invoke(app, ["new", "project"])
+    assert result.exit_code == 0
+    mocked_main.ui.confirm.assert_not_called()
+    mocked_main.rmtree.assert_not_called()
@@ -2,9 +2,14 @@
 import pytest
 from pathlib import Path
 from unittest.mock import patch, MagicMock, call
+from types import SimpleNamespace
 import subprocess
+import json
 from src.templates import NextjsTemplate
 
+# subprocess.run result for commands that succeed; only returncode is read
+COMPLETED = SimpleNamespace(returncode=0)
+
 @pytest.fixture
 def temp_dir(tmp_path):
     """Create a temporary directory for testing."""
@@ -18,183 +23,102 @@ def template(temp_dir):
 def test_basic_generation(template, temp_dir):
     """Test basic project generation without additional features."""
     with patch('subprocess.run') as mock_run:
-        mock_run.return_value = MagicMock(returncode=0)
+        mock_run.return_value = COMPLETED
         
         success = template.generate()
         assert success
         
-        # Verify create-next-app command was called with correct arguments
-        expected_cmd = [
-            "npx",
-            "create-next-app@latest",
-            "test_project",
-            "--js",  # No TypeScript
-            "--no-tailwind",  # No Tailwind
-            "--no-eslint",  # No ESLint
-            "--app",  # Use App Router
-            "--src-dir",  # Use src/ directory
-            "--import-alias", "@/*",  # Modern import alias
-            "--no-git",  # We'll handle git ourselves
-        ]
-        
-        # Check if the command was called with the correct arguments
-        actual_cmd = mock_run.call_args_list[0][0][0]
-        assert actual_cmd == expected_cmd
-        assert mock_run.call_args_list[0][1]['cwd'] == temp_dir.parent
+        # Verify a single npm install is run instead of create-next-app
+        assert mock_run.call_count == 1
+        assert mock_run.call_args_list[0][0][0] == ["npm", "install"]
+        assert mock_run.call_args_list[0][1]['cwd'] == temp_dir
+        
+        # Verify the skeleton was written
+        package = json.loads((temp_dir / "package.json").read_text())
+        assert package["name"] == "test_project"
+        assert "next" in package["dependencies"]
+        assert "devDependencies" not in package
+        assert (temp_dir / "jsconfig.json").exists()
+        assert (temp_dir / "src" / "app" / "layout.js").exists()
+        assert (temp_dir / "src" / "app" / "page.js").exists()
+        assert not (temp_dir / "tailwind.config.js").exists()
+        assert not (temp_dir / ".eslintrc.json").exists()
 
-def test_typescript_feature(temp_dir):
-    """Test project generation with TypeScript."""
-    template = NextjsTemplate("test_project", ["TypeScript"], temp_dir)
+@pytest.mark.parametrize("feature,dev_dependency,expected_files", [
+    ("TypeScript", "typescript", {"tsconfig.json": None, "src/app/layout.tsx": None}),
+    ("Tailwind CSS", "tailwindcss", {"tailwind.config.js": None, "src/app/globals.css": "@tailwind base"}),
+    ("ESLint", "eslint-config-next", {".eslintrc.json": None, "package.json": '"lint": "next lint"'}),
+], ids=["typescript", "tailwind", "eslint"])
+def test_feature_files(temp_dir, feature, dev_dependency, expected_files):
+    """Test that a feature adds its dev dependency and files to the skeleton."""
+    template = NextjsTemplate("test_project", [feature], temp_dir)
     
     with patch('subprocess.run') as mock_run:
-        mock_run.return_value = MagicMock(returncode=0)
+        mock_run.return_value = COMPLETED
         
         success = template.generate()
         assert success
         
-        # Verify TypeScript flag was included
-        cmd_args = mock_run.call_args_list[0][0][0]
-        assert "--ts" in cmd_args
+        # Verify the feature's files and dependencies were written
+        package = json.loads((temp_dir / "package.json").read_text())
+        assert dev_dependency in package["devDependencies"]
+        for path, snippet in expected_files.items():
+            assert (temp_dir / path).exists(), path
+            if snippet is not None:
+                assert snippet in (temp_dir / path).read_text()
 
-def test_tailwind_feature(temp_dir):
-    """Test project generation with Tailwind CSS."""
-    template = NextjsTemplate("test_project", ["Tailwind CSS"], temp_dir)
+@pytest.mark.parametrize("feature,packages,snippets", [
+    ("Prettier", ["prettier", "prettier-plugin-tailwindcss", "eslint-config-prettier"], ["semi", "singleQuote"]),
+    ("PWA", ["next-pwa"], ["withPWA", '"name": "Your App"']),
+    ("MongoDB", ["-D", "@prisma/client", "prisma"], ['provider = "mongodb"', "PrismaClient"]),
+], ids=["prettier", "pwa", "mongodb"])
+def test_feature_setup(temp_dir, mocker, feature, packages, snippets):
+    """Test that a feature's packages are installed and its config files written."""
+    template = NextjsTemplate("test_project", [feature], temp_dir)
+    mock_run = mocker.patch('subprocess.run', return_value=COMPLETED)
+    mock_write = mocker.patch('pathlib.Path.write_text', return_value=None)
     
-    with patch('subprocess.run') as mock_run:
-        mock_run.return_value = MagicMock(returncode=0)
-        
-        success = template.generate()
-        assert success
-        
-        # Verify Tailwind flag was included
-        cmd_args = mock_run.call_args_list[0][0][0]
-        assert "--tailwind" in cmd_args
-
-def test_eslint_feature(temp_dir):
-    """Test project generation with ESLint."""
-    template = NextjsTemplate("test_project", ["ESLint"], temp_dir)
+    success = template.generate()
+    assert success
     
-    with patch('subprocess.run') as mock_run:
-        mock_run.return_value = MagicMock(returncode=0)
-        
-        success = template.generate()
-        assert success
-        
-        # Verify ESLint flag was included
-        cmd_args = mock_run.call_args_list[0][0][0]
-        assert "--eslint" in cmd_args
-
-def test_prettier_setup(temp_dir):
-    """Test project generation with Prettier."""
-    template = NextjsTemplate("test_project", ["Prettier"], temp_dir)
+    # Verify a single npm install covered the feature's dependencies
+    assert mock_run.call_count == 1
+    npm_install_cmd = mock_run.call_args_list[0][0][0]
+    assert npm_install_cmd[:2] == ["npm", "install"]
+    for package in packages:
+        assert package in npm_install_cmd
     
-    with patch('subprocess.run') as mock_run, \
-         patch('pathlib.Path.write_text') as mock_write:
-        mock_run.return_value = MagicMock(returncode=0)
-        mock_write.return_value = None
-        
-        success = template.generate()
-        assert success
-        
-        # Verify Prettier dependencies were installed
-        npm_install_cmd = mock_run.call_args_list[1][0][0]
-        assert "prettier" in npm_install_cmd
-        assert "prettier-plugin-tailwindcss" in npm_install_cmd
-        assert "eslint-config-prettier" in npm_install_cmd
-        
-        # Verify config file was written
-        write_calls = [call.args[0] for call in mock_write.call_args_list]
-        assert any("semi" in content for content in write_calls)
-        assert any("singleQuote" in content for content in write_calls)
+    # Verify config files were written
+    written = "\n".join(call.args[0] for call in mock_write.call_args_list)
+    for snippet in snippets:
+        assert snippet in written, snippet
 
-def test_pwa_setup(temp_dir):
-    """Test project generation with PWA."""
-    template = NextjsTemplate("test_project", ["PWA"], temp_dir)
-    
-    with patch('subprocess.run') as mock_run, \
-         patch('pathlib.Path.write_text') as mock_write:
-        mock_run.return_value = MagicMock(returncode=0)
-        mock_write.return_value = None
-        
-        success = template.generate()
-        assert success
-        
-        # Verify PWA dependencies were installed
-        npm_install_cmd = mock_run.call_args_list[1][0][0]
-        assert "next-pwa" in npm_install_cmd
-        
-        # Verify config files were written
-        write_calls = [call.args[0] for call in mock_write.call_args_list]
-        assert any("withPWA" in content for content in write_calls)
-        assert any('"name": "Your App"' in content for content in write_calls)
-
-def test_mongodb_setup(temp_dir):
-    """Test project generation with MongoDB."""
-    template = NextjsTemplate("test_project", ["MongoDB"], temp_dir)
-    
-    with patch('subprocess.run') as mock_run, \
-         patch('pathlib.Path.mkdir') as mock_mkdir, \
-         patch('pathlib.Path.write_text') as mock_write:
-        mock_run.return_value = MagicMock(returncode=0)
-        mock_write.return_value = None
-        
-        success = template.generate()
-        assert success
-        
-        # Verify MongoDB dependencies were installed
-        npm_install_cmd = mock_run.call_args_list[1][0][0]
-        assert "npm" in npm_install_cmd
-        assert "install" in npm_install_cmd
-        assert "-D" in npm_install_cmd
-        assert "@prisma/client" in npm_install_cmd
-        assert "prisma" in npm_install_cmd
-        
-        # Verify Prisma was initialized
-        prisma_cmd = mock_run.call_args_list[2][0][0]
-        assert prisma_cmd == ["npx", "prisma", "init"]
-        
-        # Verify config files were written
-        write_calls = [call.args[0] for call in mock_write.call_args_list]
-        assert any('provider = "mongodb"' in content for content in write_calls)
-        assert any("PrismaClient" in content for content in write_calls)
-
-def test_multiple_features(temp_dir):
+def test_multiple_features(temp_dir, fake_run):
     """Test project generation with multiple features."""
     features = ["TypeScript", "Tailwind CSS", "ESLint", "Prettier", "PWA", "MongoDB"]
     template = NextjsTemplate("test_project", features, temp_dir)
     
-    with patch('subprocess.run') as mock_run, \
-         patch('pathlib.Path.write_text') as mock_write:
-        mock_run.return_value = MagicMock(returncode=0)
+    with patch('pathlib.Path.write_text') as mock_write:
         mock_write.return_value = None
         
         success = template.generate()
         assert success
         
-        # Verify create-next-app command includes all feature flags
-        cmd_args = mock_run.call_args_list[0][0][0]
-        assert "--ts" in cmd_args
-        assert "--tailwind" in cmd_args
-        assert "--eslint" in cmd_args
-        
         # Verify all dependencies were installed
-        npm_install_cmds = [call[0][0] for call in mock_run.call_args_list[1:]]
-        installed_packages = [pkg for cmd in npm_install_cmds for pkg in cmd if isinstance(pkg, str)]
-        
-        assert "prettier" in installed_packages
-        assert "next-pwa" in installed_packages
-        assert "@prisma/client" in installed_packages
+        installed_packages = {arg for argv in fake_run.argvs for arg in argv}
+        expected = {"prettier", "next-pwa", "@prisma/client"}
+        assert expected <= installed_packages, expected - installed_packages
         
         # Verify all config files were written
-        write_calls = [call.args[0] for call in mock_write.call_args_list]
-        assert any("semi" in content for content in write_calls)  # Prettier config
-        assert any("withPWA" in content for content in write_calls)  # PWA config
-        assert any('provider = "mongodb"' in content for content in write_calls)  # Prisma config
+        written = "\n".join(call.args[0] for call in mock_write.call_args_list)
+        assert "semi" in written  # Prettier config
+        assert "withPWA" in written  # PWA config
+        assert 'provider = "mongodb"' in written  # Prisma config
 
-def test_create_next_app_failure(template, temp_dir):
-    """Test handling of create-next-app command failure."""
+def test_base_npm_install_failure(template, temp_dir):
+    """Test handling of npm install failure without additional features."""
     with patch('subprocess.run') as mock_run:
-        mock_run.side_effect = subprocess.CalledProcessError(1, "create-next-app")
+        mock_run.side_effect = subprocess.CalledProcessError(1, "npm install")
         
         success = template.generate()
         assert not success
@@ -205,30 +129,25 @@ def test_npm_install_failure(temp_dir):
     
     with patch('subprocess.run') as mock_run, \
          patch('pathlib.Path.mkdir') as mock_mkdir:
-        mock_run.return_value = MagicMock(returncode=0)
-        mock_run.side_effect = [
-            MagicMock(returncode=0),  # create-next-app succeeds
-            subprocess.CalledProcessError(1, "npm install")  # npm install fails
-        ]
+        mock_run.return_value = COMPLETED
+        mock_run.side_effect = subprocess.CalledProcessError(1, "npm install")
         
         success = template.generate()
         assert not success
 
-def test_prisma_init_failure(temp_dir):
-    """Test handling of Prisma initialization failure."""
+def test_mongodb_files(temp_dir):
+    """Test that the Prisma files are written directly."""
     template = NextjsTemplate("test_project", ["MongoDB"], temp_dir)
     
-    with patch('subprocess.run') as mock_run, \
-         patch('pathlib.Path.mkdir') as mock_mkdir:
-        mock_run.return_value = MagicMock(returncode=0)
-        mock_run.side_effect = [
-            MagicMock(returncode=0),  # create-next-app succeeds
-            MagicMock(returncode=0),  # npm install succeeds
-            subprocess.CalledProcessError(1, "prisma init")  # prisma init fails
-        ]
+    with patch('subprocess.run') as mock_run:
+        mock_run.return_value = COMPLETED
         
         success = template.generate()
-        assert not success
+        assert success
+        
+        assert 'DATABASE_URL=""' in (temp_dir / ".env").read_text()
+        assert 'provider = "mongodb"' in (temp_dir / "prisma" / "schema.prisma").read_text()
+        assert (temp_dir / "src" / "lib" / "db.ts").exists()
 
 def test_file_write_error(temp_dir):
     """Test handling of file write errors."""
@@ -237,8 +156,32 @@ def test_file_write_error(temp_dir):
     with patch('subprocess.run') as mock_run, \
          patch('pathlib.Path.mkdir') as mock_mkdir, \
          patch('pathlib.Path.write_text') as mock_write:
-        mock_run.return_value = MagicMock(returncode=0)
+        mock_run.return_value = COMPLETED
         mock_write.side_effect = PermissionError("Permission denied")
         
         success = template.generate()
-        assert not success 
\ No newline at end of file
+        assert not success 
+    
+    # The half-written project is moved aside for background deletion
+    assert not temp_dir.exists()
+
+def test_skeleton_error_cleans_up(temp_dir, detached_rmtree):
+    """Test that a failed skeleton setup removes the partial project."""
+    template = NextjsTemplate("test_project", [], temp_dir)
+    
+    with patch('subprocess.run') as mock_run, \
+         patch.object(NextjsTemplate, '_setup_skeleton', return_value=False):
+        assert not template.generate()
+        mock_run.assert_not_called()
+    
+    assert [trash.parent for trash in detached_rmtree] == [temp_dir.parent]
+
+def test_next_version_override(temp_dir, fake_run, monkeypatch):
+    """Test that FLOW_NEXT_VERSION replaces the pinned Next.js release."""
+    monkeypatch.setenv("FLOW_NEXT_VERSION", "15.0.0")
+    template = NextjsTemplate("test_project", ["ESLint"], temp_dir)
+    assert template.generate()
+    
+    package = json.loads((temp_dir / "package.json").read_text())
+    assert package["dependencies"]["next"] == "15.0.0"
+    assert package["devDependencies"]["eslint-config-next"] == "15.0.0"
@@ -1,4 +1,5 @@
 import pytest
+import subprocess
 from pathlib import Path
 from unittest.mock import patch, MagicMock, call
 from src.templates.react_supabase import ReactSupabaseTemplate
@@ -28,68 +29,27 @@ def test_basic_generation(temp_dir):
         assert mock_write.call_count > 0
         
         # Get written content
-        written_content = [str(call[0][0]) for call in mock_write.call_args_list]
-        assert any('VITE_SUPABASE_URL' in content for content in written_content)
-        assert any('createClient' in content for content in written_content)
+        written = "\n".join(str(call[0][0]) for call in mock_write.call_args_list)
+        assert 'VITE_SUPABASE_URL' in written
+        assert 'createClient' in written
 
-def test_auth_setup(temp_dir):
-    with patch('subprocess.run') as mock_run, \
-         patch('pathlib.Path.mkdir') as mock_mkdir, \
-         patch('pathlib.Path.write_text') as mock_write:
-        
-        mock_run.return_value.returncode = 0
-        template = ReactSupabaseTemplate("test-project", ["Authentication"], temp_dir)
-        
-        assert template.generate() is True
-        
-        # Verify auth context file was created
-        assert mock_write.call_count > 0
-        
-        # Get written content
-        written_content = [str(call[0][0]) for call in mock_write.call_args_list]
-        assert any('AuthContext' in content for content in written_content)
-        assert any('AuthProvider' in content for content in written_content)
-        assert any('signInWithPassword' in content for content in written_content)
-
-def test_database_helpers_setup(temp_dir):
-    with patch('subprocess.run') as mock_run, \
-         patch('pathlib.Path.mkdir') as mock_mkdir, \
-         patch('pathlib.Path.write_text') as mock_write:
-        
-        mock_run.return_value.returncode = 0
-        template = ReactSupabaseTemplate("test-project", ["Database Helpers"], temp_dir)
-        
-        assert template.generate() is True
-        
-        # Verify database helper functions were created
-        assert mock_write.call_count > 0
-        
-        # Get written content
-        written_content = [str(call[0][0]) for call in mock_write.call_args_list]
-        assert any('fetchData' in content for content in written_content)
-        assert any('insertData' in content for content in written_content)
-        assert any('updateData' in content for content in written_content)
-        assert any('deleteData' in content for content in written_content)
-
-def test_storage_helpers_setup(temp_dir):
-    with patch('subprocess.run') as mock_run, \
-         patch('pathlib.Path.mkdir') as mock_mkdir, \
-         patch('pathlib.Path.write_text') as mock_write:
-        
-        mock_run.return_value.returncode = 0
-        template = ReactSupabaseTemplate("test-project", ["Storage Helpers"], temp_dir)
-        
-        assert template.generate() is True
-        
-        # Verify storage helper functions were created
-        assert mock_write.call_count > 0
-        
-        # Get written content
-        written_content = [str(call[0][0]) for call in mock_write.call_args_list]
-        assert any('uploadFile' in content for content in written_content)
-        assert any('downloadFile' in content for content in written_content)
-        assert any('deleteFile' in content for content in written_content)
-        assert any('getPublicUrl' in content for content in written_content)
+@pytest.mark.parametrize("feature,needles", [
+    ("Authentication", ["AuthContext", "AuthProvider", "signInWithPassword"]),
+    ("Database Helpers", ["fetchData", "insertData", "updateData", "deleteData"]),
+    ("Storage Helpers", ["uploadFile", "downloadFile", "deleteFile", "getPublicUrl"]),
+], ids=["auth", "db", "storage"])
+def test_feature_setup(temp_dir, mocker, feature, needles):
+    mocker.patch('subprocess.run').return_value.returncode = 0
+    mocker.patch('pathlib.Path.mkdir')
+    mock_write = mocker.patch('pathlib.Path.write_text')
+    
+    template = ReactSupabaseTemplate("test-project", [feature], temp_dir)
+    assert template.generate() is True
+    
+    # Verify the feature's helper files were created
+    written = "\n".join(str(call[0][0]) for call in mock_write.call_args_list)
+    for needle in needles:
+        assert needle in written, needle
 
 def test_multiple_features(temp_dir):
     with patch('subprocess.run') as mock_run, \
@@ -109,21 +69,19 @@ def test_multiple_features(temp_dir):
         assert mock_write.call_count > 0
         
         # Get written content
-        written_content = [str(call[0][0]) for call in mock_write.call_args_list]
-        assert any('AuthContext' in content for content in written_content)
-        assert any('fetchData' in content for content in written_content)
-        assert any('uploadFile' in content for content in written_content)
+        written = "\n".join(str(call[0][0]) for call in mock_write.call_args_list)
+        assert 'AuthContext' in written
+        assert 'fetchData' in written
+        assert 'uploadFile' in written
 
-def test_npm_install_failure(temp_dir):
+def test_npm_install_failure(temp_dir, detached_rmtree):
     with patch('subprocess.run') as mock_run, \
          patch('pathlib.Path.mkdir') as mock_mkdir, \
          patch('pathlib.Path.write_text') as mock_write:
         
         def mock_run_side_effect(args, **kwargs):
             if '@supabase/supabase-js' in args:
-                result = MagicMock()
-                result.returncode = 1
-                return result
+                raise subprocess.CalledProcessError(1, args)
             result = MagicMock()
             result.returncode = 0
             return result
@@ -132,6 +90,8 @@ def test_npm_install_failure(temp_dir):
         template = ReactSupabaseTemplate("test-project", [], temp_dir)
         
         assert template.generate() is False
+        assert not temp_dir.exists()
+        assert [trash.parent for trash in detached_rmtree] == [temp_dir.parent]
 
 def test_file_write_error(temp_dir):
     with patch('subprocess.run') as mock_run, \
@@ -150,46 +110,55 @@ def test_base_template_generation_failure(temp_dir):
         template = ReactSupabaseTemplate("test-project", [], temp_dir)
         assert template.generate() is False
 
-def test_supabase_client_setup_error(temp_dir):
+def _fail_writes_containing(snippet):
+    """Build a write_text stand-in that fails for content containing snippet."""
+    def write_text(content, *args, **kwargs):
+        if snippet in content:
+            raise PermissionError("Permission denied")
+    return write_text
+
+@pytest.mark.parametrize("features,snippet", [
+    ([], "createClient"),
+    (["Authentication"], "AuthProvider"),
+    (["Database Helpers"], "insertData"),
+    (["Storage Helpers"], "getPublicUrl"),
+], ids=["client", "auth", "db", "storage"])
+def test_setup_error(temp_dir, mocker, features, snippet):
+    mocker.patch('subprocess.run').return_value.returncode = 0
+    mocker.patch('pathlib.Path.mkdir')
+    # Make the feature's file write fail
+    mock_write = mocker.patch('pathlib.Path.write_text', side_effect=_fail_writes_containing(snippet))
+    
+    template = ReactSupabaseTemplate("test-project", features, temp_dir)
+    assert template.generate() is False
+    # Queued files are written in parallel, so the failing write need not be the last
+    assert any(snippet in call.args[0] for call in mock_write.call_args_list)
+
+def test_supabase_installed_with_base_dependencies(temp_dir):
     with patch('subprocess.run') as mock_run, \
          patch('pathlib.Path.mkdir') as mock_mkdir, \
          patch('pathlib.Path.write_text') as mock_write:
         
         mock_run.return_value.returncode = 0
-        mock_write.side_effect = [None, PermissionError()]  # Make second write fail
-        
         template = ReactSupabaseTemplate("test-project", [], temp_dir)
-        assert template.generate() is False
-
-def test_auth_setup_error(temp_dir):
-    with patch('subprocess.run') as mock_run, \
-         patch('pathlib.Path.mkdir') as mock_mkdir, \
-         patch('pathlib.Path.write_text') as mock_write:
         
-        mock_run.return_value.returncode = 0
-        mock_write.side_effect = [None, None, PermissionError()]  # Make auth file write fail
+        assert template.generate() is True
         
-        template = ReactSupabaseTemplate("test-project", ["Authentication"], temp_dir)
-        assert template.generate() is False
+        npm_install_calls = [list(call[0][0]) for call in mock_run.call_args_list if 'install' in call[0][0]]
+        assert npm_install_calls == [['npm', 'install', '@supabase/supabase-js']]
 
-def test_database_helpers_setup_error(temp_dir):
+def test_supabase_batched_with_feature_packages(temp_dir):
     with patch('subprocess.run') as mock_run, \
          patch('pathlib.Path.mkdir') as mock_mkdir, \
          patch('pathlib.Path.write_text') as mock_write:
         
         mock_run.return_value.returncode = 0
-        mock_write.side_effect = [None, None, PermissionError()]  # Make db helpers file write fail
+        template = ReactSupabaseTemplate("test-project", ["Tailwind CSS"], temp_dir)
         
-        template = ReactSupabaseTemplate("test-project", ["Database Helpers"], temp_dir)
-        assert template.generate() is False
-
-def test_storage_helpers_setup_error(temp_dir):
-    with patch('subprocess.run') as mock_run, \
-         patch('pathlib.Path.mkdir') as mock_mkdir, \
-         patch('pathlib.Path.write_text') as mock_write:
-        
-        mock_run.return_value.returncode = 0
-        mock_write.side_effect = [None, None, PermissionError()]  # Make storage helpers file write fail
+        assert template.generate() is True
         
-        template = ReactSupabaseTemplate("test-project", ["Storage Helpers"], temp_dir)
-        assert template.generate() is False 
\ No newline at end of file
+        npm_install_calls = [list(call[0][0]) for call in mock_run.call_args_list if 'install' in call[0][0]]
+        assert npm_install_calls == [
+            ['npm', 'install', '@supabase/supabase-js'],
+            ['npm', 'install', '-D', 'tailwindcss', 'postcss', 'autoprefixer'],
+        ]
@@ -1,8 +1,17 @@
 """Tests for React template."""
 import pytest
+import os
+import shutil
+import subprocess
+import time
 from pathlib import Path
 from unittest.mock import patch, MagicMock, call
+from types import SimpleNamespace
 from src.templates import ReactTemplate
+from src.templates.base import _SCAFFOLD_TTL
+
+# subprocess.run result for commands that succeed; only returncode is read
+COMPLETED = SimpleNamespace(returncode=0)
 
 @pytest.fixture
 def temp_dir(tmp_path):
@@ -12,7 +21,7 @@ def temp_dir(tmp_path):
 def test_basic_generation(temp_dir):
     """Test basic project generation without additional features."""
     with patch('subprocess.run') as mock_run:
-        mock_run.return_value = MagicMock(returncode=0)
+        mock_run.return_value = COMPLETED
         
         template = ReactTemplate("test-project", [], temp_dir)
         success = template.generate()
@@ -25,7 +34,7 @@ def test_tailwind_setup(temp_dir):
     with patch('subprocess.run') as mock_run, \
          patch('pathlib.Path.write_text') as mock_write:
         
-        mock_run.return_value = MagicMock(returncode=0)
+        mock_run.return_value = COMPLETED
         template = ReactTemplate("test-project", ["Tailwind CSS"], temp_dir)
         
         # Create necessary directories
@@ -44,7 +53,7 @@ def test_linting_setup(temp_dir):
     with patch('subprocess.run') as mock_run, \
          patch('pathlib.Path.write_text') as mock_write:
         
-        mock_run.return_value = MagicMock(returncode=0)
+        mock_run.return_value = COMPLETED
         template = ReactTemplate("test-project", ["ESLint", "Prettier"], temp_dir)
         
         # Create necessary directories
@@ -54,20 +63,18 @@ def test_linting_setup(temp_dir):
         assert success
         
         # Verify files were written with correct content
-        written_content = [args[0] for args, _ in mock_write.call_args_list]
-        assert any('plugin:react/recommended' in content for content in written_content)
-        assert any('singleQuote' in content for content in written_content)
+        written = "\n".join(args[0] for args, _ in mock_write.call_args_list)
+        assert 'plugin:react/recommended' in written
+        assert 'singleQuote' in written
 
-def test_npm_install_failure(temp_dir):
+def test_npm_install_failure(temp_dir, detached_rmtree):
     """Test handling of npm install failure."""
     with patch('subprocess.run') as mock_run, \
          patch('pathlib.Path.write_text') as mock_write:
         
         def mock_run_side_effect(args, **kwargs):
             if 'install' in args and 'create' not in args:
-                result = MagicMock()
-                result.returncode = 1
-                return result
+                raise subprocess.CalledProcessError(1, args)
             result = MagicMock()
             result.returncode = 0
             return result
@@ -82,13 +89,16 @@ def test_npm_install_failure(temp_dir):
         
         success = template.generate()
         assert not success
+        # The partial project is moved aside for background deletion
+        assert not temp_dir.exists()
+        assert [trash.parent for trash in detached_rmtree] == [temp_dir.parent]
 
 def test_file_write_error(temp_dir):
     """Test handling of file write errors."""
     with patch('subprocess.run') as mock_run, \
          patch('pathlib.Path.write_text') as mock_write:
         
-        mock_run.return_value = MagicMock(returncode=0)
+        mock_run.return_value = COMPLETED
         mock_write.side_effect = PermissionError()
         
         template = ReactTemplate("test-project", ["Tailwind CSS"], temp_dir)
@@ -97,4 +107,82 @@ def test_file_write_error(temp_dir):
         (temp_dir / "src").mkdir(parents=True, exist_ok=True)
         
         success = template.generate()
-        assert not success 
\ No newline at end of file
+        assert not success 
+def test_dependencies_installed_once(temp_dir):
+    """Test that feature packages are installed in a single npm run."""
+    with patch('subprocess.run') as mock_run:
+        mock_run.return_value = COMPLETED
+        template = ReactTemplate("test-project", ["Tailwind CSS", "ESLint", "Prettier"], temp_dir)
+        
+        success = template.generate()
+        assert success
+        
+        commands = [args[0] for args, _ in mock_run.call_args_list]
+        assert len(commands) == 2
+        assert commands[0][:3] == ["npm", "create", "vite@latest"]
+        assert commands[1][:3] == ["npm", "install", "-D"]
+        assert "tailwindcss" in commands[1]
+        assert "eslint" in commands[1]
+        assert "prettier" in commands[1]
+        assert (temp_dir / "postcss.config.js").exists()
+
+def test_scaffold_cached(temp_dir):
+    """Test that create-vite output is cached and reused for later projects."""
+    first_dir = temp_dir / "first"
+    second_dir = temp_dir / "second"
+    
+    def create_vite(args, **kwargs):
+        if "create" in args:
+            first_dir.mkdir()
+            (first_dir / "package.json").write_text('{"name": "first"}')
+        return COMPLETED
+    
+    with patch('subprocess.run', side_effect=create_vite):
+        assert ReactTemplate("first", [], first_dir).generate()
+    
+    with patch('subprocess.run') as mock_run:
+        mock_run.return_value = COMPLETED
+        assert ReactTemplate("second", [], second_dir).generate()
+        
+        commands = [args[0] for args, _ in mock_run.call_args_list]
+        assert commands == [["npm", "install"]]
+    assert '"name": "second"' in (second_dir / "package.json").read_text()
+
+def test_scaffold_cache_refresh(temp_dir, flow_dir):
+    """Test that refreshing the cache runs create-vite again."""
+    template = ReactTemplate("test-project", [], temp_dir / "test-project", refresh_cache=True)
+    archive = template._scaffold_archive("react")
+    archive.parent.mkdir(parents=True)
+    archive.write_bytes(b"")
+    
+    with patch('subprocess.run') as mock_run:
+        mock_run.return_value = COMPLETED
+        assert template.generate()
+        
+        assert mock_run.call_args_list[0][0][0][:3] == ["npm", "create", "vite@latest"]
+
+def test_scaffold_cache_expired(temp_dir, flow_dir):
+    """Test that a cached scaffold older than the TTL runs create-vite again."""
+    template = ReactTemplate("test-project", [], temp_dir / "test-project")
+    archive = template._scaffold_archive("react")
+    (temp_dir / "cached").mkdir()
+    (temp_dir / "cached" / "package.json").write_text('{"name": "cached"}')
+    shutil.make_archive(str(archive.with_suffix("")), "tar", root_dir=temp_dir / "cached")
+    expired = time.time() - _SCAFFOLD_TTL - 60
+    os.utime(archive, (expired, expired))
+    
+    with patch('subprocess.run') as mock_run:
+        mock_run.return_value = COMPLETED
+        assert template.generate()
+        
+        assert mock_run.call_args_list[0][0][0][:3] == ["npm", "create", "vite@latest"]
+
+def test_scaffold_save_failure_leaves_no_temp_file(temp_dir, flow_dir):
+    """Test that a failed scaffold save removes its partial archive."""
+    template = ReactTemplate("test-project", [], temp_dir)
+    archive = template._scaffold_archive("react")
+    
+    with patch('os.replace', side_effect=OSError("disk full")):
+        template._save_scaffold(archive)
+    
+    assert list(archive.parent.iterdir()) == []
@@ -2,9 +2,64 @@
 import pytest
 from pathlib import Path
 from unittest.mock import patch, MagicMock, call
+from types import SimpleNamespace
+import itertools
 import subprocess
+import tarfile
 from src.templates import T3Template
 
+# subprocess.run result for commands that succeed; only returncode is read
+COMPLETED = SimpleNamespace(returncode=0)
+
+# create-t3-app command for a project without features
+EXPECTED_BASIC_CMD = (
+    "npx",
+    "create-t3-app@latest",
+    "test_project",
+    "--noGit",
+    "--CI",
+    "--noInstall",
+    "--tailwind", "true",
+    "--trpc", "true",
+    "--appRouter", "true",
+)
+
+# The create-t3-app flags, installed packages and file snippets each
+# feature adds
+T3_FEATURES = {
+    "NextAuth": (["--nextAuth"], [], []),
+    "Prisma": (["--prisma"], [], []),
+    "PWA": ([], ["next-pwa"], ["withPWA"]),
+    "Jest": ([], ["ts-jest"], ["preset: 'ts-jest'"]),
+    "tRPC-Sub": ([], ["@trpc/server"], ["createWSClient"]),
+}
+
+# Feature sets in which every pair of features appears in all four
+# on/off combinations; --all-combinations tests every subset instead
+PAIRWISE_FEATURES = [
+    (),
+    ("Jest", "tRPC-Sub"),
+    ("Prisma", "PWA"),
+    ("NextAuth", "PWA", "tRPC-Sub"),
+    ("NextAuth", "Prisma", "Jest"),
+    ("NextAuth", "Prisma", "PWA", "Jest", "tRPC-Sub"),
+]
+
+def pytest_generate_tests(metafunc):
+    if "features" in metafunc.fixturenames:
+        if metafunc.config.getoption("all_combinations"):
+            combinations = [
+                combo for size in range(len(T3_FEATURES) + 1)
+                for combo in itertools.combinations(T3_FEATURES, size)
+            ]
+        else:
+            combinations = PAIRWISE_FEATURES
+        metafunc.parametrize("features", combinations, ids=lambda combo: "+".join(combo) or "none")
+
+def _written_text(root: Path) -> str:
+    """Return the contents of every file generated under root, joined."""
+    return "\n".join(path.read_text() for path in sorted(root.rglob("*")) if path.is_file())
+
 @pytest.fixture
 def temp_dir(tmp_path):
     """Create a temporary directory for testing."""
@@ -15,175 +70,83 @@ def template(temp_dir):
     """Create a T3 template instance."""
     return T3Template("test_project", [], temp_dir)
 
-def test_basic_generation(template, temp_dir):
+def test_basic_generation(template, temp_dir, fake_run):
     """Test basic project generation without additional features."""
-    with patch('subprocess.run') as mock_run:
-        mock_run.return_value = MagicMock(returncode=0)
-        
-        success = template.generate()
-        assert success
-        
-        # Verify create-t3-app command was called with correct arguments
-        expected_cmd = [
-            "npx",
-            "create-t3-app@latest",
-            "test_project",
-            "--noGit",
-            "--CI",
-            "--tailwind", "true",
-            "--trpc", "true",
-            "--appRouter", "true"
-        ]
-        
-        # Check if the command was called with the correct arguments
-        actual_cmd = mock_run.call_args_list[0][0][0]
-        assert actual_cmd == expected_cmd
-        assert mock_run.call_args_list[0][1]['cwd'] == temp_dir.parent
+    success = template.generate()
+    assert success
+    
+    # Verify create-t3-app command was called with correct arguments
+    assert tuple(fake_run.argvs[0]) == EXPECTED_BASIC_CMD
+    assert fake_run.kwargs[0]['cwd'] == temp_dir.parent
+    # create-t3-app leaves installing to the template
+    assert fake_run.argvs[1:] == [["npm", "install"]]
 
-def test_nextauth_feature(temp_dir):
+def test_nextauth_feature(temp_dir, fake_run):
     """Test project generation with NextAuth feature."""
     template = T3Template("test_project", ["NextAuth"], temp_dir)
     
-    with patch('subprocess.run') as mock_run:
-        mock_run.return_value = MagicMock(returncode=0)
-        
-        success = template.generate()
-        assert success
-        
-        # Verify NextAuth flag was included
-        cmd_args = mock_run.call_args_list[0][0][0]
-        assert "--nextAuth" in cmd_args
-        assert "true" in cmd_args
+    success = template.generate()
+    assert success
+    
+    # Verify NextAuth flag was included
+    cmd_args = fake_run.argvs[0]
+    assert "--nextAuth" in cmd_args
+    assert "true" in cmd_args
 
-def test_prisma_feature(temp_dir):
+def test_prisma_feature(temp_dir, fake_run):
     """Test project generation with Prisma feature."""
     template = T3Template("test_project", ["Prisma"], temp_dir)
     
-    with patch('subprocess.run') as mock_run:
-        mock_run.return_value = MagicMock(returncode=0)
-        
-        success = template.generate()
-        assert success
-        
-        # Verify Prisma flag was included
-        cmd_args = mock_run.call_args_list[0][0][0]
-        assert "--prisma" in cmd_args
-        assert "true" in cmd_args
+    success = template.generate()
+    assert success
+    
+    # Verify Prisma flag was included
+    cmd_args = fake_run.argvs[0]
+    assert "--prisma" in cmd_args
+    assert "true" in cmd_args
 
-def test_pwa_setup(temp_dir):
-    """Test project generation with PWA feature."""
-    template = T3Template("test_project", ["PWA"], temp_dir)
+@pytest.mark.parametrize("feature,packages,snippets", [
+    ("PWA", ["next-pwa"], ["withPWA", '"name": "T3 App"']),
+    ("Jest", ["@testing-library/react", "jest", "ts-jest"], ["preset: 'ts-jest'", "@testing-library/jest-dom"]),
+    ("tRPC-Sub", ["@trpc/server", "@trpc/client", "ws"], ["createWSClient", "wsLink"]),
+], ids=["pwa", "jest", "trpc-sub"])
+def test_feature_setup(temp_dir, fake_run, feature, packages, snippets):
+    """Test that a feature installs its packages and writes its files."""
+    template = T3Template("test_project", [feature], temp_dir)
     
-    with patch('subprocess.run') as mock_run, \
-         patch('pathlib.Path.mkdir') as mock_mkdir, \
-         patch('pathlib.Path.write_text') as mock_write:
-        mock_run.return_value = MagicMock(returncode=0)
-        mock_write.return_value = None  # write_text returns None
-        
-        success = template.generate()
-        assert success
-        
-        # Verify PWA dependencies were installed
-        npm_install_cmd = mock_run.call_args_list[1][0][0]
-        assert "next-pwa" in npm_install_cmd
-        
-        # Verify directories were created
-        mock_mkdir.assert_called()
-        
-        # Verify files were written with correct content
-        write_calls = [call.args[0] for call in mock_write.call_args_list]
-        assert any("withPWA" in content for content in write_calls)
-        assert any('"name": "T3 App"' in content for content in write_calls)
-
-def test_jest_setup(temp_dir):
-    """Test project generation with Jest feature."""
-    template = T3Template("test_project", ["Jest"], temp_dir)
-    
-    with patch('subprocess.run') as mock_run, \
-         patch('pathlib.Path.mkdir') as mock_mkdir, \
-         patch('pathlib.Path.write_text') as mock_write:
-        mock_run.return_value = MagicMock(returncode=0)
-        mock_write.return_value = None  # write_text returns None
-        
-        success = template.generate()
-        assert success
-        
-        # Verify Jest dependencies were installed
-        npm_install_cmd = mock_run.call_args_list[1][0][0]
-        assert "@testing-library/react" in npm_install_cmd
-        assert "jest" in npm_install_cmd
-        assert "ts-jest" in npm_install_cmd
-        
-        # Verify directories were created
-        mock_mkdir.assert_called()
-        
-        # Verify files were written with correct content
-        write_calls = [call.args[0] for call in mock_write.call_args_list]
-        assert any("preset: 'ts-jest'" in content for content in write_calls)
-        assert any("@testing-library/jest-dom" in content for content in write_calls)
-
-def test_trpc_subscriptions_setup(temp_dir):
-    """Test project generation with tRPC subscriptions feature."""
-    template = T3Template("test_project", ["tRPC-Sub"], temp_dir)
-    
-    with patch('subprocess.run') as mock_run, \
-         patch('pathlib.Path.mkdir') as mock_mkdir, \
-         patch('pathlib.Path.write_text') as mock_write:
-        mock_run.return_value = MagicMock(returncode=0)
-        mock_write.return_value = None  # write_text returns None
-        
-        success = template.generate()
-        assert success
-        
-        # Verify tRPC subscription dependencies were installed
-        npm_install_cmd = mock_run.call_args_list[1][0][0]
-        assert "@trpc/server" in npm_install_cmd
-        assert "@trpc/client" in npm_install_cmd
-        assert "ws" in npm_install_cmd
-        
-        # Verify directories were created
-        mock_mkdir.assert_called()
-        
-        # Verify files were written with correct content
-        write_calls = [call.args[0] for call in mock_write.call_args_list]
-        assert any("createWSClient" in content for content in write_calls)
-        assert any("wsLink" in content for content in write_calls)
-
-def test_multiple_features(temp_dir):
-    """Test project generation with multiple features."""
-    features = ["NextAuth", "Prisma", "PWA", "Jest", "tRPC-Sub"]
-    template = T3Template("test_project", features, temp_dir)
-    
-    with patch('subprocess.run') as mock_run, \
-         patch('pathlib.Path.mkdir') as mock_mkdir, \
-         patch('pathlib.Path.write_text') as mock_write:
-        mock_run.return_value = MagicMock(returncode=0)
-        mock_write.return_value = None  # write_text returns None
-        
-        success = template.generate()
-        assert success
-        
-        # Verify create-t3-app command includes all feature flags
-        cmd_args = mock_run.call_args_list[0][0][0]
-        assert "--nextAuth" in cmd_args
-        assert "--prisma" in cmd_args
-        
-        # Verify all dependencies were installed
-        npm_install_cmds = [call[0][0] for call in mock_run.call_args_list[1:]]
-        installed_packages = [pkg for cmd in npm_install_cmds for pkg in cmd if isinstance(pkg, str)]
-        
-        assert "next-pwa" in installed_packages
-        assert "@testing-library/react" in installed_packages
-        assert "@trpc/server" in installed_packages
-        
-        # Verify directories were created
-        mock_mkdir.assert_called()
-        
-        # Verify files were written with correct content
-        write_calls = [call.args[0] for call in mock_write.call_args_list]
-        assert any("withPWA" in content for content in write_calls)
-        assert any("preset: 'ts-jest'" in content for content in write_calls)
-        assert any("createWSClient" in content for content in write_calls)
+    success = template.generate()
+    assert success
+    
+    # Verify the feature's dependencies were installed
+    installed_packages = {arg for argv in fake_run.argvs[1:] for arg in argv}
+    missing = [package for package in packages if package not in installed_packages]
+    assert not missing, missing
+    
+    # Verify files were written with correct content
+    written = _written_text(temp_dir)
+    missing = [snippet for snippet in snippets if snippet not in written]
+    assert not missing, missing
+
+def test_multiple_features(temp_dir, fake_run, features):
+    """Test project generation with a combination of features."""
+    template = T3Template("test_project", list(features), temp_dir)
+    
+    success = template.generate()
+    assert success
+    
+    cmd_args = fake_run.argvs[0]
+    installed_packages = {arg for argv in fake_run.argvs[1:] for arg in argv}
+    written = _written_text(temp_dir)
+    
+    # Each feature adds its flags, packages and files, and only when selected
+    for feature, (flags, packages, snippets) in T3_FEATURES.items():
+        selected = feature in features
+        for flag in flags:
+            assert (flag in cmd_args) == selected, (feature, flag)
+        for package in packages:
+            assert (package in installed_packages) == selected, (feature, package)
+        for snippet in snippets:
+            assert (snippet in written) == selected, (feature, snippet)
 
 def test_create_t3_app_failure(template, temp_dir):
     """Test handling of create-t3-app command failure."""
@@ -201,17 +164,79 @@ def test_npm_install_failure(temp_dir):
         def mock_run_with_npm_failure(cmd, *args, **kwargs):
             if "npm" in cmd:
                 raise subprocess.CalledProcessError(1, cmd)
-            return MagicMock(returncode=0)
+            return COMPLETED
         
         mock_run.side_effect = mock_run_with_npm_failure
         
         success = template.generate()
         assert not success
 
-def test_file_write_error(template, temp_dir):
+def test_scaffold_cached_without_installs_or_secrets(temp_dir):
+    """Test that cached scaffolds leave out node_modules and .env, which is regenerated."""
+    first_dir = temp_dir / "first"
+    second_dir = temp_dir / "second"
+    
+    def create_t3_app(args, **kwargs):
+        if "create-t3-app@latest" in args:
+            first_dir.mkdir()
+            (first_dir / "package.json").write_text('{"name": "first"}')
+            (first_dir / ".env.example").write_text('DATABASE_URL="file:./db.sqlite"\nAUTH_SECRET=""\n')
+            (first_dir / ".env").write_text('DATABASE_URL="file:./db.sqlite"\nAUTH_SECRET="first-secret"\n')
+        elif args[:2] == ["npm", "install"]:
+            (kwargs["cwd"] / "node_modules" / "next").mkdir(parents=True)
+        return COMPLETED
+    
+    first = T3Template("first", [], first_dir)
+    with patch('subprocess.run', side_effect=create_t3_app):
+        assert first.generate()
+    
+    with tarfile.open(first._scaffold_archive(*EXPECTED_BASIC_CMD[3:])) as tar:
+        cached = {Path(name).name for name in tar.getnames()}
+    assert {"package.json", ".env.example"} <= cached
+    assert not cached & {"node_modules", ".env"}
+    
+    with patch('subprocess.run', side_effect=create_t3_app) as mock_run:
+        assert T3Template("second", [], second_dir).generate()
+        assert not any("create-t3-app@latest" in args[0] for args, _ in mock_run.call_args_list)
+    
+    env = (second_dir / ".env").read_text()
+    assert 'DATABASE_URL="file:./db.sqlite"' in env
+    assert "first-secret" not in env and 'AUTH_SECRET=""' not in env
+    assert '"name": "second"' in (second_dir / "package.json").read_text()
+
+def test_feature_directories_created_together(temp_dir, fake_run):
+    """Test that the feature directories are created in one sweep."""
+    template = T3Template("test_project", ["PWA", "Jest", "tRPC-Sub"], temp_dir)
+    
+    with patch('pathlib.Path.mkdir', autospec=True) as mock_mkdir, \
+         patch('pathlib.Path.write_text'):
+        assert template.generate()
+        
+        created = [call.args[0] for call in mock_mkdir.call_args_list if temp_dir in call.args[0].parents]
+        assert created == [temp_dir / "public", temp_dir / "src" / "test", temp_dir / "src" / "utils"]
+
+def test_create_t3_app_command(temp_dir, fake_run):
+    """Test that create-t3-app gets the feature flags followed by the core options."""
+    template = T3Template("test_project", ["Prisma"], temp_dir)
+    
+    with patch('pathlib.Path.write_text'):
+        assert template.generate()
+        
+        assert fake_run.argvs[0] == [
+            "npx", "create-t3-app@latest", "test_project", "--noGit", "--CI", "--noInstall",
+            "--prisma", "true",
+            "--tailwind", "true", "--trpc", "true", "--appRouter", "true",
+        ]
+
+def test_file_write_error(template, temp_dir, fake_run, detached_rmtree, capsys):
     """Test handling of file write errors."""
     with patch('pathlib.Path.write_text') as mock_write:
         mock_write.side_effect = PermissionError("Permission denied")
         
         success = template.generate()
-        assert not success 
\ No newline at end of file
+        assert not success
+    
+    assert "Error during project generation: Permission denied" in capsys.readouterr().out
+    # The partial project is moved aside for background deletion
+    assert not temp_dir.exists()
+    assert [trash.parent for trash in detached_rmtree] == [temp_dir.parent]
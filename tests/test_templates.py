@@ -2,25 +2,38 @@
 import pytest
 from pathlib import Path
 from unittest.mock import patch, MagicMock
+from types import SimpleNamespace
 from src.templates import (
     ReactTemplate,
     VueTemplate,
     DjangoTemplate,
     PythonTemplate
 )
+from src.ui import UI
+import ast
+import re
 import subprocess
+import sys
 
+# subprocess.run result for commands that succeed; only returncode is read
+COMPLETED = SimpleNamespace(returncode=0)
+
+# Files each template writes itself; scaffolder output such as package.json
+# or manage.py never appears because the scaffolders are mocked
 @pytest.mark.parametrize("template_class,expected_files", [
-    (ReactTemplate, ["package.json", "src", "public"]),
-    (VueTemplate, ["package.json", "src", "public"]),
-    (DjangoTemplate, ["manage.py", "requirements.txt", "core"]),
+    (ReactTemplate, ["src", "tailwind.config.js", ".eslintrc.json"]),
+    (VueTemplate, ["src", "tailwind.config.js"]),
+    (DjangoTemplate, ["requirements.txt", "core", "config"]),
     (PythonTemplate, ["src", "tests", "requirements.txt"]),
 ])
+@patch('subprocess.Popen')
 @patch('subprocess.run')
-def test_template_generation(mock_run, temp_dir, mock_features, template_class, expected_files):
+def test_template_generation(mock_run, mock_popen, temp_dir, mock_features, template_class, expected_files):
     """Test that each template generates the expected project structure."""
     # Mock successful command execution
-    mock_run.return_value = MagicMock(returncode=0)
+    mock_run.return_value = COMPLETED
+    mock_popen.return_value.communicate.return_value = (None, b"")
+    mock_popen.return_value.returncode = 0
     
     project_name = "test_project"
     project_dir = temp_dir / project_name
@@ -28,13 +41,6 @@ def test_template_generation(mock_run, temp_dir, mock_features, template_class,
     # Create project directory
     project_dir.mkdir(parents=True, exist_ok=True)
     
-    # Create expected files/directories for testing
-    for file in expected_files:
-        if '.' in file:  # It's a file
-            (project_dir / file).touch()
-        else:  # It's a directory
-            (project_dir / file).mkdir(parents=True, exist_ok=True)
-    
     template = template_class(project_name, mock_features, project_dir)
     success = template.generate()
     
@@ -60,17 +66,33 @@ def test_template_cleanup_on_failure(mock_run, temp_dir):
     assert not success
     assert not project_dir.exists()  # Directory should be cleaned up
 
+# Every feature offered by any template; each template ignores the ones it lacks
+ALL_FEATURES = [
+    "TypeScript",
+    "Tailwind CSS",
+    "ESLint",
+    "Prettier",
+    "Testing",
+    "Docker",
+    "PWA",
+    "Authentication"
+]
+
+@pytest.mark.parametrize("features", [[], ALL_FEATURES], ids=["no-features", "all-features"])
 @pytest.mark.parametrize("template_class", [
     ReactTemplate,
     VueTemplate,
     DjangoTemplate,
     PythonTemplate
 ])
+@patch('subprocess.Popen')
 @patch('subprocess.run')
-def test_template_feature_handling(mock_run, temp_dir, template_class):
+def test_template_feature_handling(mock_run, mock_popen, temp_dir, template_class, features):
     """Test that templates properly handle different feature combinations."""
     # Mock successful command execution
-    mock_run.return_value = MagicMock(returncode=0)
+    mock_run.return_value = COMPLETED
+    mock_popen.return_value.communicate.return_value = (None, b"")
+    mock_popen.return_value.returncode = 0
     
     project_name = "test_project"
     project_dir = temp_dir / project_name
@@ -78,31 +100,244 @@ def test_template_feature_handling(mock_run, temp_dir, template_class):
     # Create project directory
     project_dir.mkdir(parents=True, exist_ok=True)
     
-    # Test with no features
-    template = template_class(project_name, [], project_dir)
+    template = template_class(project_name, features, project_dir)
     success = template.generate()
     assert success
+
+@patch('subprocess.Popen')
+@patch('subprocess.run')
+def test_django_pip_install_failure(mock_run, mock_popen, temp_dir, detached_rmtree):
+    """Test that a failed background pip install aborts Django generation."""
+    mock_run.return_value = COMPLETED
+    mock_popen.return_value.communicate.return_value = (None, b"pip failed")
+    mock_popen.return_value.returncode = 1
+    
+    project_dir = temp_dir / "test_project"
+    template = DjangoTemplate("test_project", [], project_dir)
+    success = template.generate()
+    
+    assert not success
+    assert not project_dir.exists()
+    assert [trash.parent for trash in detached_rmtree] == [temp_dir]
+    # Only the venv creation ran; startproject never started
+    assert mock_run.call_count == 1
+
+@patch('subprocess.Popen')
+@patch('subprocess.run')
+def test_django_setup_error_reaps_pip(mock_run, mock_popen, temp_dir):
+    """Test that the background pip install is killed and reaped when setup fails."""
+    mock_run.return_value = COMPLETED
+    
+    template = DjangoTemplate("test_project", [], temp_dir / "test_project")
+    with patch.object(DjangoTemplate, "_setup_env", side_effect=PermissionError("Permission denied")):
+        with pytest.raises(PermissionError):
+            template.generate()
+    
+    mock_popen.return_value.kill.assert_called_once()
+    mock_popen.return_value.wait.assert_called_once()
+
+def test_django_settings_include_selected_features(temp_dir):
+    """Test that Django settings are rewritten and selected apps are spliced in."""
+    project_dir = temp_dir / "test_project"
+    template = DjangoTemplate("test_project", ["CORS", "WhiteNoise"], project_dir)
+    template._setup_settings()
+    
+    settings = (project_dir / "config" / "settings.py").read_text()
+    assert "SECRET_KEY = env('SECRET_KEY')\n" in settings
+    assert "DEBUG = env('DEBUG')" in settings
+    assert "ALLOWED_HOSTS = env.list('ALLOWED_HOSTS')" in settings
+    assert "environ.Env.read_env" in settings
+    assert "INSTALLED_APPS = [\n    'core.apps.CoreConfig',\n    'corsheaders'," in settings
+    assert (
+        "'django.middleware.security.SecurityMiddleware',\n"
+        "    'corsheaders.middleware.CorsMiddleware',\n"
+        "    'whitenoise.middleware.WhiteNoiseMiddleware',"
+    ) in settings
+    assert "debug_toolbar" not in settings
+
+def test_django_compose_services(temp_dir):
+    """Test that docker-compose only references the selected services."""
+    template = DjangoTemplate("test_project", ["Redis"], temp_dir)
+    template._setup_docker()
+    
+    compose = (temp_dir / "docker-compose.yml").read_text()
+    assert "depends_on:\n      - redis\n" in compose
+    assert "- db" not in compose
+    assert "volumes:\n  postgres_data:" not in compose
+
+def test_templates_are_imported_lazily():
+    """Test that importing the templates package does not import every template."""
+    code = (
+        "import sys, src.templates as t; "
+        "assert 'src.templates.django' not in sys.modules; "
+        "t.PythonTemplate; "
+        "assert 'src.templates.python' in sys.modules; "
+        "assert 'src.templates.django' not in sys.modules"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=Path(__file__).parent.parent)
+    assert result.returncode == 0
+
+# pip distribution providing each third-party app the Django template can enable
+DJANGO_APP_PACKAGES = {
+    "django_extensions": "django-extensions",
+    "debug_toolbar": "django-debug-toolbar",
+    "rest_framework": "djangorestframework",
+    "drf_spectacular": "drf-spectacular",
+    "corsheaders": "django-cors-headers",
+    "allauth": "django-allauth",
+}
+
+@patch('subprocess.Popen')
+@patch('subprocess.run')
+def test_django_installed_apps_have_requirements(mock_run, mock_popen, temp_dir):
+    """Test that every app added to INSTALLED_APPS is installed and listed in requirements.txt."""
+    mock_run.return_value = COMPLETED
+    mock_popen.return_value.communicate.return_value = (None, b"")
+    mock_popen.return_value.returncode = 0
+    
+    features = [choice["value"] for choice in UI._FEATURE_CHOICES["Django Full-stack"]]
+    project_dir = temp_dir / "test_project"
+    template = DjangoTemplate("test_project", features, project_dir)
+    assert template.generate()
+    
+    settings = (project_dir / "config" / "settings.py").read_text()
+    installed_apps = settings.split("INSTALLED_APPS = [", 1)[1].split("]", 1)[0]
+    apps = {
+        app.split(".")[0] for app in re.findall(r"'([\w.]+)'", installed_apps)
+        if not app.startswith(("django.", "core."))
+    }
+    assert apps <= DJANGO_APP_PACKAGES.keys(), apps - DJANGO_APP_PACKAGES.keys()
+    
+    pip_packages = {re.split(r"[<>=]", arg)[0] for arg in mock_popen.call_args[0][0]}
+    requirements = (project_dir / "requirements.txt").read_text().splitlines()
+    for app in apps:
+        package = DJANGO_APP_PACKAGES[app]
+        assert package in pip_packages, app
+        assert any(line.startswith(package) for line in requirements), app
+
+@patch('subprocess.Popen')
+@patch('subprocess.run')
+def test_django_single_pip_install(mock_run, mock_popen, temp_dir):
+    """Test that Django dependencies, including test tools, are installed in one pip call."""
+    mock_run.return_value = COMPLETED
+    mock_popen.return_value.communicate.return_value = (None, b"")
+    mock_popen.return_value.returncode = 0
     
-    # Clean up
-    if project_dir.exists():
-        import shutil
-        shutil.rmtree(project_dir)
-    
-    # Test with all features
-    all_features = [
-        "TypeScript",
-        "Tailwind CSS",
-        "ESLint",
-        "Prettier",
-        "Testing",
-        "Docker",
-        "PWA",
-        "Authentication"
+    project_dir = temp_dir / "test_project"
+    template = DjangoTemplate("test_project", ["Testing"], project_dir)
+    assert template.generate()
+    
+    mock_popen.assert_called_once()
+    pip_cmd = mock_popen.call_args[0][0]
+    assert pip_cmd[:4] == [str(template._venv_python()), "-m", "pip", "install"]
+    assert "pytest-django" in pip_cmd
+    assert not any(
+        Path(call[0][0][0]).name.startswith("pip") or call[0][0][1:3] == ["-m", "pip"]
+        for call in mock_run.call_args_list
+    )
+
+def test_registry_entries_resolve():
+    """Test that every registered template resolves to a BaseTemplate subclass."""
+    import src.templates as templates
+    from src.templates._registry import REGISTRY
+    from src.templates.base import BaseTemplate
+    
+    for _, _, class_name, _ in REGISTRY:
+        assert issubclass(getattr(templates, class_name), BaseTemplate)
+
+def test_template_modules_define_classes_once():
+    """Test that no template module defines the same class twice."""
+    templates_dir = Path(__file__).parent.parent / "src" / "templates"
+    
+    for module in templates_dir.glob("*.py"):
+        tree = ast.parse(module.read_text())
+        names = [node.name for node in tree.body if isinstance(node, ast.ClassDef)]
+        assert len(names) == len(set(names)), f"duplicate class in {module.name}"
+
+@patch('subprocess.run')
+def test_vue_create_flags(mock_run, temp_dir):
+    """Test that create-vue receives a flag for each selected feature only."""
+    mock_run.return_value = COMPLETED
+    
+    template = VueTemplate("test_project", ["TypeScript", "Pinia"], temp_dir / "test_project")
+    assert template.generate()
+    
+    create_cmd = mock_run.call_args_list[0][0][0]
+    assert create_cmd[:5] == ["npm", "create", "vue@latest", "test_project", "--"]
+    assert create_cmd[5:] == ["--typescript", "--pinia"]
+
+def test_python_readme_uses_project_name(temp_dir):
+    """Test that the Python README is filled in with the project name."""
+    project_dir = temp_dir / "my_project"
+    assert PythonTemplate("my_project", [], project_dir).generate()
+    
+    assert (project_dir / "README.md").read_text().startswith("# my_project\n")
+    assert "MyProject" in (project_dir / "src" / "main.py").read_text()
+
+@patch('subprocess.run')
+def test_vue_tailwind_without_npx(mock_run, temp_dir):
+    """Test that Tailwind config files are written instead of running tailwindcss init."""
+    mock_run.return_value = COMPLETED
+    
+    project_dir = temp_dir / "test_project"
+    assert VueTemplate("test_project", ["Tailwind CSS"], project_dir).generate()
+    
+    assert not any(call[0][0][0] == "npx" for call in mock_run.call_args_list)
+    assert "tailwindcss" in (project_dir / "postcss.config.js").read_text()
+    assert (project_dir / "tailwind.config.js").exists()
+
+@patch('subprocess.run')
+def test_vue_batched_installs(mock_run, temp_dir):
+    """Test that Vue feature packages are installed in one call per dependency type."""
+    mock_run.return_value = COMPLETED
+    
+    project_dir = temp_dir / "test_project"
+    features = ["Tailwind CSS", "PWA", "i18n"]
+    assert VueTemplate("test_project", features, project_dir).generate()
+    
+    installs = [call[0][0] for call in mock_run.call_args_list if call[0][0][:2] == ["npm", "install"]]
+    assert installs == [
+        ["npm", "install", "vue-i18n@9"],
+        ["npm", "install", "-D", "tailwindcss", "postcss", "autoprefixer", "vite-plugin-pwa"],
     ]
+    assert all(call.kwargs["cwd"] == project_dir for call in mock_run.call_args_list[1:])
+
+def test_vue_scaffold_cached(temp_dir):
+    """Test that create-vue output is cached per flag set and reused."""
+    first_dir = temp_dir / "first"
     
-    # Create project directory again
-    project_dir.mkdir(parents=True, exist_ok=True)
+    def create_vue(args, **kwargs):
+        if "create" in args:
+            first_dir.mkdir()
+            (first_dir / "package.json").write_text('{"name": "first"}')
+            (first_dir / "README.md").write_text("# first\n\nThis template should help get you started developing with Vue 3 in Vite.\n")
+        return COMPLETED
     
-    template = template_class(project_name, all_features, project_dir)
-    success = template.generate()
-    assert success 
\ No newline at end of file
+    with patch('subprocess.run', side_effect=create_vue):
+        assert VueTemplate("first", ["Pinia"], first_dir).generate()
+    
+    with patch('subprocess.run') as mock_run:
+        mock_run.return_value = COMPLETED
+        assert VueTemplate("second", ["Pinia"], temp_dir / "second").generate()
+        assert [args[0] for args, _ in mock_run.call_args_list] == [["npm", "install"]]
+        
+        assert VueTemplate("third", ["Vitest"], temp_dir / "third").generate()
+        assert mock_run.call_args_list[1][0][0][:3] == ["npm", "create", "vue@latest"]
+    assert '"name": "second"' in (temp_dir / "second" / "package.json").read_text()
+    assert (temp_dir / "second" / "README.md").read_text().startswith("# second\n")
+    assert "first" not in (temp_dir / "second" / "README.md").read_text()
+
+@patch('subprocess.run')
+def test_vue_feature_files_flushed_together(mock_run, temp_dir):
+    """Test that Vue feature files are queued and written in one flush."""
+    mock_run.return_value = COMPLETED
+    
+    project_dir = temp_dir / "test_project"
+    template = VueTemplate("test_project", ["Tailwind CSS", "PWA", "i18n"], project_dir)
+    flush = VueTemplate._flush_files
+    with patch.object(VueTemplate, "_flush_files", autospec=True, side_effect=flush) as mock_flush:
+        assert template.generate()
+    
+    mock_flush.assert_called_once()
+    assert (project_dir / "src" / "i18n" / "index.js").exists()
+    assert (project_dir / "vite.config.js").exists()
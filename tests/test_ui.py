@@ -1,126 +1,93 @@
 """Tests for UI class."""
 import pytest
 from unittest.mock import patch, MagicMock
+from types import SimpleNamespace
 from src.ui import UI
 
 @pytest.fixture
+def prompts(mocker):
+    """Patch every questionary prompt used by the UI."""
+    return SimpleNamespace(
+        text=mocker.patch('questionary.text'),
+        select=mocker.patch('questionary.select'),
+        checkbox=mocker.patch('questionary.checkbox'),
+        confirm=mocker.patch('questionary.confirm')
+    )
+
+@pytest.fixture(scope="module")
 def ui():
     """Create a UI instance for testing."""
+    # UI keeps no per-instance state, so one instance serves the module
     return UI()
 
-def test_project_categories(ui):
-    """Test that project categories are properly defined."""
-    assert len(ui.PROJECT_CATEGORIES) > 0
-    for category in ui.PROJECT_CATEGORIES:
-        assert "name" in category
-        assert "display" in category
-        assert "description" in category
-        assert "value" in category
-
-def test_project_templates(ui):
-    """Test that project templates are properly defined."""
-    assert len(ui.PROJECT_TEMPLATES) > 0
-    for category, templates in ui.PROJECT_TEMPLATES.items():
-        assert len(templates) > 0
-        for template in templates:
-            assert "name" in template
-            assert "display" in template
-            assert "description" in template
-            assert "value" in template
-
-def test_react_frameworks(ui):
-    """Test that React frameworks are properly defined."""
-    assert len(ui.REACT_FRAMEWORKS) > 0
-    for framework in ui.REACT_FRAMEWORKS:
-        assert "name" in framework
-        assert "value" in framework
+@pytest.mark.parametrize("attribute,keys", [
+    ("PROJECT_CATEGORIES", {"name", "display", "description", "value"}),
+    ("PROJECT_TEMPLATES", {"name", "display", "description", "value"}),
+    ("REACT_FRAMEWORKS", {"name", "value"}),
+], ids=["categories", "templates", "react-frameworks"])
+def test_choice_definitions(ui, attribute, keys):
+    """Test that prompt choices are properly defined."""
+    entries = getattr(ui, attribute)
+    if isinstance(entries, dict):
+        # Templates are grouped by category, and no category may be empty
+        assert all(entries.values())
+        entries = [entry for group in entries.values() for entry in group]
+    assert len(entries) > 0
+    for entry in entries:
+        assert keys <= entry.keys(), keys - entry.keys()
 
-@patch('questionary.text')
-def test_get_project_name(mock_text, ui):
-    """Test project name input."""
-    # Test valid name
-    mock_text.return_value.ask.return_value = "test_project"
-    assert ui.get_project_name() == "test_project"
-    
-    # Test empty name
-    mock_text.return_value.ask.return_value = ""
-    assert ui.get_project_name() == ""  # UI returns empty string for empty input
-    
-    # Test None
-    mock_text.return_value.ask.return_value = None
-    assert ui.get_project_name() is None  # UI returns None for None input
+@pytest.mark.parametrize("answer", ["test_project", "", None], ids=["valid", "empty", "none"])
+def test_get_project_name(ui, prompts, answer):
+    """Test that the project name answer is returned unchanged."""
+    prompts.text.return_value.ask.return_value = answer
+    assert ui.get_project_name() is answer
 
-@patch('questionary.select')
-def test_select_category(mock_select, ui):
+@pytest.mark.parametrize("answer", ["web", None], ids=["selected", "none"])
+def test_select_category(ui, prompts, answer):
     """Test category selection."""
-    # Test valid selection
-    mock_select.return_value.ask.return_value = "web"
-    assert ui.select_category() == "web"
-    
-    # Test no selection
-    mock_select.return_value.ask.return_value = None
-    assert ui.select_category() is None
+    prompts.select.return_value.ask.return_value = answer
+    assert ui.select_category() is answer
 
-@patch('questionary.select')
-def test_select_project_type(mock_select, ui):
+def test_select_project_type(ui, prompts):
     """Test project type selection."""
     # Test valid selection for web category
-    mock_select.return_value.ask.return_value = "React Frontend"
+    prompts.select.return_value.ask.return_value = "React Frontend"
     assert ui.select_project_type("web") == "React Frontend"
     
     # Test no selection
-    mock_select.return_value.ask.return_value = None
+    prompts.select.return_value.ask.return_value = None
     assert ui.select_project_type("web") is None
     
     # Test invalid category
     assert ui.select_project_type("invalid") is None
 
-@patch('questionary.select')
-def test_select_react_framework(mock_select, ui):
+@pytest.mark.parametrize("answer", ["next", "vite", None], ids=["next", "vite", "none"])
+def test_select_react_framework(ui, prompts, answer):
     """Test React framework selection."""
-    # Test Next.js selection
-    mock_select.return_value.ask.return_value = "next"
-    assert ui.select_react_framework() == "next"
-    
-    # Test Vite selection
-    mock_select.return_value.ask.return_value = "vite"
-    assert ui.select_react_framework() == "vite"
-    
-    # Test no selection
-    mock_select.return_value.ask.return_value = None
-    assert ui.select_react_framework() is None
+    prompts.select.return_value.ask.return_value = answer
+    assert ui.select_react_framework() is answer
 
-@patch('questionary.checkbox')
-def test_select_features(mock_checkbox, ui):
+def test_select_features(ui, prompts):
     """Test feature selection."""
     features = ["TypeScript", "Tailwind CSS", "ESLint"]
     
     # Test selecting multiple features
-    mock_checkbox.return_value.ask.return_value = features
+    prompts.checkbox.return_value.ask.return_value = features
     assert ui.select_features("React Frontend") == features
     
     # Test no features selected
-    mock_checkbox.return_value.ask.return_value = []
+    prompts.checkbox.return_value.ask.return_value = []
     assert ui.select_features("React Frontend") == []
     
     # Test None returned
-    mock_checkbox.return_value.ask.return_value = None
+    prompts.checkbox.return_value.ask.return_value = None
     assert ui.select_features("React Frontend") == []
 
-@patch('questionary.confirm')
-def test_confirm(mock_confirm, ui):
-    """Test confirmation dialog."""
-    # Test confirmation
-    mock_confirm.return_value.ask.return_value = True
-    assert ui.confirm("Are you sure?") is True
-    
-    # Test rejection
-    mock_confirm.return_value.ask.return_value = False
-    assert ui.confirm("Are you sure?") is False
-    
-    # Test no response
-    mock_confirm.return_value.ask.return_value = None
-    assert ui.confirm("Are you sure?") is None  # UI returns None for no response
+@pytest.mark.parametrize("answer", [True, False, None], ids=["yes", "no", "none"])
+def test_confirm(ui, prompts, answer):
+    """Test that the confirmation answer is returned unchanged."""
+    prompts.confirm.return_value.ask.return_value = answer
+    assert ui.confirm("Are you sure?") is answer
 
 @patch('rich.console.Console.print')
 def test_print_methods(mock_print, ui):
@@ -141,11 +108,10 @@ def test_print_methods(mock_print, ui):
     ui.print_info("Test Info")
     mock_print.assert_called()
 
-@patch('questionary.checkbox')
-def test_available_features(mock_checkbox, ui):
+def test_available_features(ui, prompts):
     """Test getting available features for different project types."""
     # Mock checkbox to return empty list to avoid interactive prompt
-    mock_checkbox.return_value.ask.return_value = []
+    prompts.checkbox.return_value.ask.return_value = []
     
     # Test React Frontend features
     react_features = ui.select_features("React Frontend")
@@ -158,4 +124,33 @@ def test_available_features(mock_checkbox, ui):
     # Test unknown project type
     unknown_features = ui.select_features("Unknown")
     assert isinstance(unknown_features, list)
-    assert len(unknown_features) == 0 
\ No newline at end of file
+    assert len(unknown_features) == 0 
+@patch('rich.console.Console.print')
+def test_static_panels_reused(mock_print, ui, prompts):
+    """Test that fixed section headers reuse the same Panel."""
+    prompts.text.return_value.ask.return_value = "demo"
+    ui.get_project_name()
+    mock_print.assert_called_once()
+    first = mock_print.call_args.args[0]
+    mock_print.reset_mock()
+    ui.get_project_name()
+    assert mock_print.call_args.args[0] is first
+
+@patch('rich.console.Console.print')
+def test_feature_choices_precomputed(mock_print, ui, prompts):
+    """Test that feature choices come from the precomputed tables."""
+    prompts.checkbox.return_value.ask.return_value = []
+    ui.select_features("React + Supabase", "next")
+    values = [c["value"] for c in prompts.checkbox.call_args.kwargs["choices"]]
+    assert values[:4] == ["TypeScript", "Tailwind CSS", "ESLint", "Prettier"]
+    assert values.index("PWA") < values.index("Authentication")
+
+    ui.select_features("Vue Frontend", "next")
+    assert prompts.checkbox.call_args.kwargs["choices"] is ui._FEATURE_CHOICES["Vue Frontend"]
+
+def test_prompt_styles_shared(ui, prompts):
+    """Test that prompts reuse the styles built at class load."""
+    ui.select_react_framework()
+    ui.confirm("Continue?")
+    assert prompts.select.call_args.kwargs["style"] is ui._SELECT_STYLE
+    assert prompts.confirm.call_args.kwargs["style"] is ui._INPUT_STYLE